@@ -4,6 +4,7 @@ from mvapi.libs.misc import import_object
 from mvapi.settings import settings
 from .migration import migration
 from .run_temp_script import run_temp_script
+from .sessions import sessions
 from .user import user
 from .web import web
 
@@ -18,5 +19,6 @@ def cli():
 
 cli.add_command(migration)
 cli.add_command(run_temp_script)
+cli.add_command(sessions)
 cli.add_command(user)
 cli.add_command(web)
@@ -0,0 +1,12 @@
+import click
+
+from .prune import prune
+
+
+@click.group()
+def sessions():
+    """Manage sessions"""
+    pass
+
+
+sessions.add_command(prune)
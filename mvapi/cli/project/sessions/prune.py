@@ -0,0 +1,23 @@
+import click
+
+from mvapi.libs.logger import logger
+from mvapi.web.libs.sessionpruner import SessionPruner
+
+
+@click.command('prune', short_help='Delete expired and revoked sessions')
+@click.option('--batch-size', '-b', type=int, help='Sessions per batch')
+@click.option('--sleep', '-s', type=float, help='Seconds between batches')
+@click.option('--dry-run', is_flag=True, help='Only count the sessions')
+def prune(batch_size, sleep, dry_run):
+    """Delete expired and revoked sessions in batches"""
+
+    pruner = SessionPruner(batch_size=batch_size, sleep=sleep)
+
+    if dry_run:
+        logger.info(f'{pruner.count()} sessions would be deleted')
+        return
+
+    removed, elapsed = pruner.prune()
+    rate = removed / elapsed if elapsed else 0
+    logger.info(f'Deleted {removed} sessions in {elapsed:.1f}s, '
+                f'{rate:.0f} per second')
@@ -1,5 +1,6 @@
 import click
 
+from .benchmark_json import benchmark_json
 from .run import run_
 
 
@@ -10,4 +11,5 @@ def web():
     pass
 
 
+web.add_command(benchmark_json)
 web.add_command(run_)
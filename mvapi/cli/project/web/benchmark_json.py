@@ -0,0 +1,60 @@
+import timeit
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import click
+
+from mvapi.libs.logger import logger
+from mvapi.web.libs.jsonbackend import get_json_backend, JSON_BACKENDS
+
+
+def get_document(count):
+    now = datetime.utcnow()
+    data = []
+
+    for idx in range(count):
+        resource_id = uuid4()
+        data.append(OrderedDict([
+            ('type', 'user'),
+            ('id', resource_id),
+            ('attributes', OrderedDict([
+                ('created_date', now - timedelta(minutes=idx)),
+                ('modified_date', now),
+                ('email', f'user{idx}@example.com'),
+                ('name', f'User {idx}'),
+                ('is_admin', False),
+            ])),
+            ('links', OrderedDict([
+                ('self', f'https://example.com/api/users/{resource_id}')
+            ]))
+        ]))
+
+    return OrderedDict([
+        ('links', {'self': 'https://example.com/api/users'}),
+        ('data', data)
+    ])
+
+
+@click.command('benchmark-json',
+               short_help='Compare JSON backends on a list document')
+@click.option('--count', '-c', default=1000, help='Resources in the document')
+@click.option('--number', '-n', default=100, help='Encodings per backend')
+def benchmark_json(count, number):
+    """Encode a document of resources with every installed JSON backend"""
+
+    document = get_document(count)
+
+    for name in JSON_BACKENDS:
+        backend = get_json_backend(name)
+        if backend.name != name:
+            continue
+
+        encoded = backend.dumps(document)
+        dumps_time = timeit.timeit(lambda: backend.dumps(document),
+                                   number=number) / number
+        loads_time = timeit.timeit(lambda: backend.loads(encoded),
+                                   number=number) / number
+
+        logger.info(f'{name}: dumps {dumps_time * 1000:.2f} ms, '
+                    f'loads {loads_time * 1000:.2f} ms')
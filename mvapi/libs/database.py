@@ -1,26 +1,152 @@
+import threading
 import time
+from contextlib import contextmanager
+from functools import wraps
+from itertools import count
 
-from sqlalchemy import create_engine, event
+from blinker import signal
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.engine.base import Engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm import scoped_session, Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
+from mvapi.libs.exceptions import ReadOnlySessionError
 from mvapi.settings import settings
 from mvapi.web.libs.logger import logger
 
+pool_checkout = signal('mvapi.db_pool_checkout')
+
+
+# The pool usage is reported on every checkout, taking the last connection
+# is logged as the next checkouts wait up to pool_timeout
+def watch_pool_checkouts(pool: QueuePool, capacity):
+    # noinspection PyUnusedLocal
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out = pool.checkedout()
+        pool_checkout.send(pool, checked_out=checked_out, capacity=capacity)
+
+        if capacity and checked_out >= capacity:
+            logger.warning(f'All {capacity} database connections are checked '
+                           f'out, the next checkouts wait up to '
+                           f'{pool.timeout()}s')
+
+    event.listen(pool, 'checkout', on_checkout)
+
+
+def create_db_engine(uri):
+    options = {
+        'pool_pre_ping': settings.DB_POOL_PRE_PING,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+    }
+
+    url = make_url(uri)
+
+    # SQLite uses its own pools
+    if url.get_backend_name() != 'sqlite':
+        options.update({
+            'pool_size': settings.DB_POOL_SIZE,
+            'max_overflow': settings.DB_MAX_OVERFLOW,
+            'pool_timeout': settings.DB_POOL_TIMEOUT,
+            'pool_use_lifo': settings.DB_POOL_USE_LIFO,
+        })
+
+    if settings.DB_EXECUTEMANY_MODE and url.get_driver_name() == 'psycopg2':
+        options['executemany_mode'] = settings.DB_EXECUTEMANY_MODE
+
+    engine = create_engine(url, **options)
+
+    # A negative overflow doesn't limit the connections
+    if isinstance(engine.pool, QueuePool):
+        capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW \
+            if settings.DB_MAX_OVERFLOW >= 0 else None
+        watch_pool_checkouts(engine.pool, capacity)
+
+    return engine
+
+
+class ReplicaBalancer:
+    def __init__(self, engines, strategy='round_robin'):
+        if strategy not in ('round_robin', 'least_connections'):
+            raise ValueError(f'Replica balancing {strategy} is not supported')
+
+        self.engines = engines
+        self.strategy = strategy
+        self.__counter = count()
+        self.__lock = threading.Lock()
+
+    def choose(self):
+        if self.strategy == 'least_connections':
+            return min(self.engines, key=lambda e: self.__checked_out(e))
+
+        with self.__lock:
+            idx = next(self.__counter) % len(self.engines)
+
+        return self.engines[idx]
+
+    @staticmethod
+    def __checked_out(engine):
+        checkedout = getattr(engine.pool, 'checkedout', None)
+        return checkedout() if checkedout else 0
+
+
+# SELECT statements go to a replica until the session has flushed
+class RoutingSession(Session):
+    def __init__(self, balancer: ReplicaBalancer = None, **kwargs):
+        super(RoutingSession, self).__init__(**kwargs)
+        self.balancer = balancer
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.reads_from_replica and getattr(clause, 'is_select', False):
+            if 'replica' not in self.info:
+                self.info['replica'] = self.balancer.choose()
+            return self.info['replica']
+
+        return super(RoutingSession, self).get_bind(mapper=mapper,
+                                                    clause=clause, **kwargs)
+
+    @property
+    def reads_from_replica(self):
+        return bool(self.balancer and self.info.get('use_replica') and
+                    not self.info.get('wrote'))
+
 
 class DB:
     __instance = None
     session = None
+    __sticky_users = None
+    __sticky_lock = None
 
     def __new__(cls):
         if cls.__instance is None:
             cls.__instance = super(DB, cls).__new__(cls)
+            cls.__instance.__sticky_users = {}
+            cls.__instance.__sticky_lock = threading.Lock()
+
+            engine = create_db_engine(settings.SQLALCHEMY_DATABASE_URI)
+
+            balancer = None
+            if settings.DB_REPLICA_URIS:
+                balancer = ReplicaBalancer(
+                    engines=[create_db_engine(uri)
+                             for uri in settings.DB_REPLICA_URIS],
+                    strategy=settings.DB_REPLICA_BALANCING
+                )
 
-            engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
             cls.__instance.session = scoped_session(
-                sessionmaker(autocommit=False, bind=engine)
+                sessionmaker(class_=RoutingSession, autocommit=False,
+                             bind=engine, balancer=balancer)
             )
 
+            event.listen(cls.__instance.session, 'before_flush',
+                         cls.__instance.__before_flush)
+            event.listen(cls.__instance.session, 'after_flush',
+                         cls.__instance.__after_flush)
+            event.listen(cls.__instance.session, 'after_begin',
+                         cls.__instance.__after_begin)
+            event.listen(cls.__instance.session, 'after_transaction_end',
+                         cls.__instance.__after_transaction_end)
+
         return cls.__instance
 
     def __init__(*args, **kwargs):
@@ -41,5 +167,131 @@ class DB:
                 total = time.time() - conn.info['query_start_time'].pop(-1)
                 logger.debug(f'Query Complete. Total Time: {str(total)}\n')
 
+    # noinspection PyUnusedLocal
+    @staticmethod
+    def __before_flush(session, flush_context, instances):
+        if session.info.get('read_only'):
+            raise ReadOnlySessionError('Changes can\'t be saved in a read '
+                                       'only request')
+
+    # noinspection PyUnusedLocal
+    def __after_flush(self, session, flush_context):
+        session.info['wrote'] = True
+
+        if not settings.DB_REPLICA_STICKINESS:
+            return
+
+        # The users the written rows belong to read from the primary too,
+        # e.g. a user who has just logged in isn't authenticated yet
+        user_ids = {getattr(obj, 'user_id', None)
+                    for obj in (*session.new, *session.dirty)}
+        user_ids.add(session.info.get('user_id'))
+        user_ids.discard(None)
+
+        if user_ids:
+            with self.__sticky_lock:
+                now = time.monotonic()
+                for user_id in user_ids:
+                    self.__sticky_users[user_id] = \
+                        now + settings.DB_REPLICA_STICKINESS
+
+                if len(self.__sticky_users) > \
+                        settings.DB_REPLICA_STICKY_USERS:
+                    self.__sticky_users = {
+                        k: v for k, v in self.__sticky_users.items()
+                        if v > now
+                    }
+
+    # noinspection PyUnusedLocal
+    def __after_begin(self, session, transaction, connection):
+        session.info.setdefault('connections', []).append(connection)
+
+        if session.info.get('read_only') and \
+                connection.dialect.name == 'postgresql':
+            connection.execute(text('SET TRANSACTION READ ONLY'))
+
+        timeout = session.info.get('statement_timeout')
+        if timeout:
+            self.__apply_statement_timeout(connection, timeout)
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    def __after_transaction_end(session, transaction):
+        if transaction.parent is None:
+            session.info.pop('connections', None)
+
+    @staticmethod
+    def __apply_statement_timeout(connection, timeout):
+        if connection.dialect.name == 'postgresql':
+            connection.execute(
+                text(f'SET LOCAL statement_timeout = {int(timeout)}')
+            )
+
+    def set_statement_timeout(self, timeout):
+        # The timeout is in milliseconds, it only applies on PostgreSQL
+        session = self.session()
+        session.info['statement_timeout'] = timeout
+
+        for connection in session.info.get('connections', []):
+            self.__apply_statement_timeout(connection, timeout)
+
+    @property
+    def read_only(self):
+        return bool(self.session.info.get('read_only'))
+
+    @property
+    def sticky_until(self):
+        # The time until which a client that has written keeps reading from
+        # the primary database, it's passed back by the client to any process
+        session = self.session()
+        if not (session.balancer and session.info.get('wrote') and
+                settings.DB_REPLICA_STICKINESS):
+            return None
+
+        return time.time() + settings.DB_REPLICA_STICKINESS
+
+    def set_read_only(self, read_only=True, user_id=None, primary_until=None):
+        # A user who has written recently keeps reading from the primary
+        # database
+        use_replica = read_only
+
+        try:
+            if primary_until and float(primary_until) > time.time():
+                use_replica = False
+        except ValueError:
+            pass
+
+        if user_id:
+            self.session.info['user_id'] = user_id
+
+            expires = self.__sticky_users.get(user_id)
+            if expires and expires > time.monotonic():
+                use_replica = False
+
+        self.session.info['read_only'] = read_only
+        self.session.info['use_replica'] = use_replica
+
+    @contextmanager
+    def primary(self):
+        use_replica = self.session.info.get('use_replica')
+        self.session.info['use_replica'] = False
+
+        try:
+            yield
+        finally:
+            self.session.info['use_replica'] = use_replica
+
+
+def read_only(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        db.set_read_only()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            db.set_read_only(False)
+
+    return wrapper
+
 
 db = DB()
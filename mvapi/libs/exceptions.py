@@ -10,6 +10,10 @@ class NoSettingsModuleSpecified(Exception):
     pass
 
 
+class InvalidSettingError(Exception):
+    pass
+
+
 ###
 
 class ModelKeyError(AppException):
@@ -18,3 +22,7 @@ class ModelKeyError(AppException):
 
 class NotFoundError(AppException):
     pass
+
+
+class ReadOnlySessionError(AppException):
+    pass
@@ -1,11 +1,78 @@
+import atexit
 import logging
 import logging.config
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 from mvapi.settings import settings
 
 logger = logging.getLogger(settings.ROOT_LOGGER_NAME)
 
+_listener = None
+
+
+# Records are dropped and counted while the queue is full
+class DroppingQueueHandler(QueueHandler):
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    def __init__(self, queue_handler, *handlers):
+        super(DrainingQueueListener, self).__init__(
+            queue_handler.queue, *handlers, respect_handler_level=True
+        )
+        self.queue_handler = queue_handler
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        super(DrainingQueueListener, self).stop()
+
+        dropped = self.queue_handler.dropped
+        if dropped:
+            self.handle(logging.makeLogRecord({
+                'name': logger.name,
+                'levelno': logging.WARNING,
+                'levelname': logging.getLevelName(logging.WARNING),
+                'msg': f'{dropped} log records were dropped, the logging '
+                       f'queue was full',
+            }))
+
 
 def init_logger():
+    global _listener
+
+    if _listener:
+        _listener.stop()
+        _listener = None
+
     if settings.LOGGING:
         logging.config.dictConfig(settings.LOGGING)
+
+    # The handlers are run by a listener thread, the records are only
+    # enqueued by the threads that log them
+    if settings.LOGGING_QUEUE and logger.handlers:
+        queue_handler = DroppingQueueHandler(
+            queue.Queue(maxsize=settings.LOGGING_QUEUE_SIZE)
+        )
+
+        _listener = DrainingQueueListener(queue_handler, *logger.handlers)
+        _listener.start()
+
+        logger.handlers = [queue_handler]
+        atexit.register(stop_logger)
+
+
+def stop_logger():
+    global _listener
+
+    if _listener:
+        _listener.stop()
+        _listener = None
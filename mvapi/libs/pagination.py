@@ -0,0 +1,187 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from sqlalchemy import and_, Boolean, false, inspect, or_, tuple_
+from sqlalchemy.orm.exc import UnmappedColumnError
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from mvapi.libs.exceptions import ModelKeyError
+
+
+class SortKey:
+    def __init__(self, column, attr, asc, nulls_first):
+        self.column = column
+        self.attr = attr
+        self.asc = asc
+        self.nulls_first = nulls_first
+
+    @property
+    def order_by(self):
+        column = self.column.asc() if self.asc else self.column.desc()
+
+        if self.column.nullable:
+            column = (column.nullsfirst() if self.nulls_first
+                      else column.nullslast())
+
+        return column
+
+    def after(self, value):
+        if value is None:
+            return self.column.isnot(None) if self.nulls_first else false()
+
+        if self.is_boolean:
+            # SQLAlchemy only takes == and IS with True and False literals,
+            # false sorts first
+            if self.asc:
+                clause = self.column.is_(True) if value is False else false()
+            else:
+                clause = self.column.is_(False) if value is True else false()
+        else:
+            clause = self.column > value if self.asc else self.column < value
+
+        if self.column.nullable and not self.nulls_first:
+            clause = or_(clause, self.column.is_(None))
+
+        return clause
+
+    def equal(self, value):
+        if value is None or self.is_boolean:
+            return self.column.is_(value)
+        return self.column == value
+
+    @property
+    def is_boolean(self):
+        return isinstance(self.column.type, Boolean)
+
+    def dump_value(self, item):
+        value = getattr(item, self.attr)
+
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+
+        return str(value)
+
+    def load_value(self, value):
+        if value is None:
+            return None
+
+        try:
+            python_type = self.column.type.python_type
+        except NotImplementedError:
+            return value
+
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+
+        return python_type(value)
+
+
+# The cursor holds the sort key values of the last row of a page, id_ is always
+# added to make them unique
+class KeysetPagination:
+    def __init__(self, model, sort=None):
+        self.model = model
+
+        if sort is None:
+            sort = model.get_sort_fields()
+        if not isinstance(sort, (list, tuple)):
+            sort = [sort]
+
+        mapper = inspect(model)
+        self.keys = [self.__get_sort_key(mapper, item) for item in sort]
+
+        # The tiebreaker follows the direction of the last key to keep the
+        # row value comparison possible
+        if 'id_' not in {key.attr for key in self.keys}:
+            tiebreaker = model.id_.asc() if self.keys[-1].asc \
+                else model.id_.desc()
+            self.keys.append(self.__get_sort_key(mapper, tiebreaker))
+
+    @staticmethod
+    def __get_sort_key(mapper, expression):
+        if hasattr(expression, '__clause_element__'):
+            expression = expression.__clause_element__()
+
+        asc, nulls_first = True, None
+
+        while isinstance(expression, UnaryExpression):
+            modifier = expression.modifier
+
+            if modifier in (operators.desc_op, operators.asc_op):
+                asc = modifier is operators.asc_op
+            elif modifier in (operators.nulls_first_op,
+                              operators.nulls_last_op):
+                if nulls_first is None:
+                    nulls_first = modifier is operators.nulls_first_op
+            else:
+                break
+
+            expression = expression.element
+
+        try:
+            attr = mapper.get_property_by_column(expression).key
+        except (UnmappedColumnError, KeyError, TypeError):
+            raise ModelKeyError('Sorting is not supported by cursor '
+                                'pagination')
+
+        # Follow the PostgreSQL behaviour when the nulls order is not set
+        # explicitly: nulls are greater than any other value
+        if nulls_first is None:
+            nulls_first = not asc
+
+        return SortKey(column=expression, attr=attr, asc=asc,
+                       nulls_first=nulls_first)
+
+    @property
+    def order_by(self):
+        return [key.order_by for key in self.keys]
+
+    def get_filter(self, cursor):
+        values = self.decode(cursor)
+
+        directions = {key.asc for key in self.keys}
+        nullable = any(key.column.nullable for key in self.keys)
+        boolean = any(key.is_boolean for key in self.keys)
+
+        # Row value comparison can use a composite index, but it's only
+        # correct when all the keys are sorted the same way and can't be null
+        if len(directions) == 1 and not nullable and not boolean:
+            columns = tuple_(*[key.column for key in self.keys])
+            values = tuple_(*values)
+            return columns > values if directions.pop() else columns < values
+
+        clauses = []
+        for idx, key in enumerate(self.keys):
+            clause = and_(
+                *[k.equal(v) for k, v in zip(self.keys[:idx], values[:idx])],
+                key.after(values[idx])
+            )
+            clauses.append(clause)
+
+        return or_(*clauses)
+
+    def encode(self, item):
+        values = [key.dump_value(item) for key in self.keys]
+        data = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    def decode(self, cursor):
+        try:
+            data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(data)
+
+            if type(values) is not list or len(values) != len(self.keys):
+                raise ValueError
+
+            return [key.load_value(value)
+                    for key, value in zip(self.keys, values)]
+
+        except (binascii.Error, TypeError, ValueError):
+            raise ModelKeyError('Pagination cursor is not valid')
@@ -2,19 +2,27 @@ import importlib
 import os
 import re
 from datetime import datetime
+from itertools import islice
+from types import MappingProxyType
 from uuid import uuid4
 
 import inflect
 import shortuuid
-from sqlalchemy import and_, Column, DateTime, inspect, String
+from sqlalchemy import and_, bindparam, cast, Column, DateTime, event, func, \
+    insert, inspect, select, String, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.declarative import declarative_base, declared_attr
-from sqlalchemy.orm import ColumnProperty, Query, RelationshipProperty
+from sqlalchemy.orm import ColumnProperty, configure_mappers, defaultload, \
+    joinedload, load_only, MANYTOONE, Mapper, Query, RelationshipProperty, \
+    selectinload
+from sqlalchemy.orm.util import identity_key
 
 import mvapi.web.models
 from mvapi.libs.database import db
 from mvapi.libs.exceptions import ModelKeyError, NotFoundError
 from mvapi.libs.misc import classproperty
+from mvapi.libs.pagination import KeysetPagination
 from mvapi.settings import settings
 
 
@@ -29,17 +37,76 @@ class BaseQuery(Query):
             raise NotFoundError
 
     def get(self, ident):
+        # The identity map is looked up first, but only without criteria,
+        # e.g. not for a dynamic relationship
+        if self.whereclause is None:
+            item = self.__get_identity(ident)
+            if item is not None:
+                return item
+
         return self.get_by(id_=ident)
 
+    def get_many(self, ids, preserve_order=True, strict=True,
+                 chunk_size=1000):
+        # The items in the identity map are taken from it, the others are
+        # selected in chunks
+        model = self.column_descriptions[0]['entity']
+        ids = list(dict.fromkeys(ids))
+        found = {}
+
+        if self.whereclause is None:
+            for ident in ids:
+                item = self.__get_identity(ident)
+                if item is not None:
+                    found[ident] = item
+
+        missing = [ident for ident in ids if ident not in found]
+        for idx in range(0, len(missing), chunk_size):
+            chunk = missing[idx:idx + chunk_size]
+            for item in self.filter(model.id_.in_(chunk)):
+                found[item.id_] = item
+
+        if strict and len(found) < len(ids):
+            raise NotFoundError
+
+        if not preserve_order:
+            return list(found.values())
+
+        return [found[ident] for ident in ids if ident in found]
+
+    def __get_identity(self, ident):
+        model = self.column_descriptions[0]['entity']
+        item = self.session.identity_map.get(identity_key(model, ident))
+
+        if item is None or inspect(item).expired or \
+                item in self.session.deleted:
+            return None
+
+        return item
+
     def get_by(self, **kwargs):
         return self.filter_by(**kwargs).one()
 
-    def apply_args(self, limit=None, offset=None, sort=None, filters=None):
+    def apply_args(self, limit=None, offset=None, sort=None, filters=None,
+                   cursor=None, options=None):
         query = self
 
+        if options:
+            query = query.options(*options)
+
         if filters:
             query = query.filter(and_(*filters))
 
+        # An empty cursor requests the first page in the keyset mode
+        if cursor is not None:
+            model = self.column_descriptions[0]['entity']
+            pagination = KeysetPagination(model, sort=sort)
+            sort = pagination.order_by
+            offset = None
+
+            if cursor:
+                query = query.filter(pagination.get_filter(cursor))
+
         if sort:
             query = query.order_by(*sort)
 
@@ -52,12 +119,79 @@ class BaseQuery(Query):
         return query
 
 
+# Built once per model after the mappers are configured
+class ModelSchema:
+    def __init__(self, model):
+        mapper = inspect(model)
+        attrs = mapper.attrs
+
+        self.columns = frozenset(
+            key for key, value in attrs.items()
+            if isinstance(value, ColumnProperty)
+        )
+
+        self.relationships = MappingProxyType({
+            key: frozenset(value.local_columns)
+            for key, value in attrs.items()
+            if isinstance(value, RelationshipProperty)
+        })
+
+        foreign_keys = {}
+        for key, columns in self.relationships.items():
+            for column in columns:
+                if column.name in self.columns:
+                    foreign_keys[column.name] = key
+
+        self.foreign_keys = MappingProxyType(foreign_keys)
+        self.relationship_keys = frozenset(self.relationships.keys()) | \
+            frozenset(foreign_keys.keys())
+
+        required_keys = set()
+        for key in self.columns:
+            attr = getattr(model, key)
+            if hasattr(attr, 'nullable') and not attr.nullable:
+                required_keys.add(key)
+
+        for key, columns in self.relationships.items():
+            for column in columns:
+                if column.name in required_keys:
+                    required_keys.add(key)
+                    required_keys.remove(column.name)
+
+        self.required_keys = frozenset(required_keys)
+
+        # To-one relationships which linkage can be built from the foreign
+        # key column and the type of the related model
+        linkage = {}
+        for key, prop in mapper.relationships.items():
+            if prop.direction is not MANYTOONE or \
+                    len(prop.local_remote_pairs) != 1:
+                continue
+
+            local, remote = prop.local_remote_pairs[0]
+            if local.table is not mapper.local_table or \
+                    not remote.primary_key:
+                continue
+
+            linkage[key] = (mapper.get_property_by_column(local).key,
+                            prop.mapper.local_table.name.lower())
+
+        self.linkage = MappingProxyType(linkage)
+
+        self.dynamic_relationships = frozenset(
+            key for key, prop in mapper.relationships.items()
+            if prop.lazy == 'dynamic'
+        )
+
+
 class BaseModel(declarative_base()):
     __abstract__ = True
 
     plural = None
     name_prefix = None
     default_sort = None
+    # Rendered items are cached and validated by the dates of their changes
+    change_date_columns = ('modified_date',)
     query = db.session.query_property(query_cls=BaseQuery)
 
     id_: Column = Column('id', String(36), primary_key=True,
@@ -91,48 +225,39 @@ class BaseModel(declarative_base()):
 
         return self.plural.lower() if self.plural else self.type_
 
+    @property
+    def change_dates(self):
+        return tuple(getattr(self, key) for key in self.change_date_columns)
+
     @property
     def short_id(self):
         return shortuuid.encode(self.id_)
 
+    @classproperty
+    def schema(self) -> 'ModelSchema':
+        schema = self.__dict__.get('_schema')
+        if schema is None:
+            configure_mappers()
+            schema = self.__dict__.get('_schema') or ModelSchema(self)
+            setattr(self, '_schema', schema)
+
+        return schema
+
     @classproperty
     def available_columns(self):
-        return {key for key, value in inspect(self).mapper.attrs.items()
-                if isinstance(value, ColumnProperty)}
+        return self.schema.columns
 
     @classproperty
     def available_relationships(self):
-        attrs = inspect(self).mapper.attrs
-        return {key: value.local_columns for key, value in attrs.items()
-                if isinstance(value, RelationshipProperty)}
+        return self.schema.relationships
 
     @classproperty
     def relationship_keys(self):
-        rels = self.available_relationships
-        keys = set(rels.keys())
-
-        for fields in rels.values():
-            keys |= {field.name for field in fields
-                     if field.name in self.available_columns}
-
-        return keys
+        return self.schema.relationship_keys
 
     @classproperty
     def required_keys(self):
-        keys = set()
-
-        for key in self.available_columns:
-            attr = getattr(self, key)
-            if hasattr(attr, 'nullable') and not attr.nullable:
-                keys.add(key)
-
-        for key, value in self.available_relationships.items():
-            for column in value:
-                if column.name in keys:
-                    keys.add(key)
-                    keys.remove(column.name)
-
-        return keys
+        return self.schema.required_keys
 
     def __init__(self, **kwargs):
         invalid_attrs = []
@@ -150,7 +275,7 @@ class BaseModel(declarative_base()):
                 attrs = ', '.join(invalid_attrs)
                 raise ModelKeyError(f'Attributes {attrs} don\'t exist')
 
-        missing_keys = self.required_keys - set(kwargs.keys()) - \
+        missing_keys = self.schema.required_keys - set(kwargs.keys()) - \
                        {'id_', 'created_date', 'modified_date'}
         if missing_keys:
             keys = ', '.join(missing_keys)
@@ -159,7 +284,7 @@ class BaseModel(declarative_base()):
         super(BaseModel, self).__init__(**kwargs)
 
     def __setattr__(self, key, value):
-        if key in self.required_keys and (value is None or value == ''):
+        if key in self.schema.required_keys and (value is None or value == ''):
             raise ModelKeyError(f'Attribute {key} can\'t be null or empty')
 
         super(BaseModel, self).__setattr__(key, value)
@@ -180,6 +305,313 @@ class BaseModel(declarative_base()):
         db.session.delete(self)
         db.session.flush()
 
+    @classmethod
+    def bulk_create(cls, rows, chunk_size=1000, returning=False):
+        # The rows pass the model validators, but ORM events aren't run for
+        # them
+        db.session.flush()
+
+        table = cls.__table__
+        mapper = inspect(cls)
+        is_postgresql = db.session.get_bind().dialect.name == 'postgresql'
+        defaults = cls.__get_column_defaults()
+        results = []
+
+        for chunk in cls.__get_chunks(rows, chunk_size):
+            now = datetime.utcnow()
+            values = cls.__prepare_bulk_rows(chunk, check_missing=True)
+
+            for row in values:
+                row.setdefault('created_date', now)
+                row.setdefault('modified_date', now)
+
+                for key, default in defaults.items():
+                    if key not in row:
+                        row[key] = default.arg(None) if default.is_callable \
+                            else default.arg
+
+            # The rows are grouped by their columns and RETURNING doesn't
+            # keep the order either, the results are matched by their ids
+            objects = {}
+
+            for keys, group in cls.__group_bulk_rows(values):
+                columns = [mapper.attrs[k].columns[0] for k in keys]
+
+                if is_postgresql:
+                    source, params = cls.__get_unnest_source(keys, columns,
+                                                             group)
+                    stmt = insert(table).from_select(
+                        [c.key for c in columns], select(*source.c)
+                    )
+
+                    if returning:
+                        query = select(cls).from_statement(
+                            stmt.returning(*table.c)
+                        )
+                        objects.update({
+                            obj.id_: obj for obj in
+                            db.session.execute(query, params).scalars()
+                        })
+                    else:
+                        db.session.execute(stmt, params)
+
+                else:
+                    db.session.execute(insert(table), [
+                        {c.key: row[k] for k, c in zip(keys, columns)}
+                        for row in group
+                    ])
+
+            if objects:
+                results += [objects[row['id_']] for row in values]
+            else:
+                results += [row['id_'] for row in values]
+
+        if returning and not is_postgresql:
+            objects = {}
+            for chunk in cls.__get_chunks(results, chunk_size):
+                objects.update({obj.id_: obj for obj in
+                                cls.query.filter(cls.id_.in_(chunk))})
+
+            return [objects[id_] for id_ in results]
+
+        return results
+
+    @classmethod
+    def bulk_update(cls, rows, chunk_size=1000):
+        db.session.flush()
+
+        table = cls.__table__
+        mapper = inspect(cls)
+        pk_column = mapper.attrs['id_'].columns[0]
+        is_postgresql = db.session.get_bind().dialect.name == 'postgresql'
+        updated = 0
+
+        for chunk in cls.__get_chunks(rows, chunk_size):
+            now = datetime.utcnow()
+            values = cls.__prepare_bulk_rows(chunk, check_missing=False)
+
+            for row in values:
+                if not row.get('id_'):
+                    raise ModelKeyError('Attribute id_ can\'t be null or '
+                                        'empty')
+                row.setdefault('modified_date', now)
+
+            for keys, group in cls.__group_bulk_rows(values):
+                columns = [mapper.attrs[k].columns[0] for k in keys]
+
+                if is_postgresql:
+                    source, params = cls.__get_unnest_source(keys, columns,
+                                                             group)
+                    stmt = (
+                        update(table)
+                        .where(pk_column == source.c[pk_column.key])
+                        .values({c.key: source.c[c.key] for c in columns
+                                 if c is not pk_column})
+                    )
+
+                else:
+                    stmt = (
+                        update(table)
+                        .where(pk_column == bindparam('_bulk_id'))
+                        .values({c.key: bindparam(f'_bulk_{c.key}')
+                                 for c in columns if c is not pk_column})
+                    )
+                    params = [
+                        {f'_bulk_{c.key}': row[k]
+                         for k, c in zip(keys, columns)}
+                        for row in group
+                    ]
+
+                updated += db.session.execute(stmt, params).rowcount
+
+            # Objects loaded into the session are stale now
+            for row in values:
+                key = mapper.identity_key_from_primary_key([row['id_']])
+                obj = db.session.identity_map.get(key)
+                if obj is not None:
+                    db.session.expire(obj)
+
+        return updated
+
+    @classmethod
+    def __get_column_defaults(cls):
+        defaults = {}
+
+        for prop in inspect(cls).column_attrs:
+            default = prop.columns[0].default
+            if default is not None and (default.is_scalar or
+                                        default.is_callable):
+                defaults[prop.key] = default
+
+        return defaults
+
+    @staticmethod
+    def __get_unnest_source(keys, columns, rows):
+        # Every column is passed as a single array parameter, so the statement
+        # doesn't depend on the number of rows and is compiled only once
+        source = func.unnest(*[
+            cast(bindparam(f'_bulk_{c.key}'), ARRAY(c.type)) for c in columns
+        ]).table_valued(*[c.key for c in columns]).render_derived()
+
+        params = {f'_bulk_{c.key}': [row[k] for row in rows]
+                  for k, c in zip(keys, columns)}
+
+        return source, params
+
+    @classmethod
+    def __prepare_bulk_rows(cls, rows, check_missing):
+        schema = cls.schema
+        mapper = inspect(cls)
+
+        keys = set()
+        for row in rows:
+            keys.update(row.keys())
+
+        invalid_keys = keys - schema.columns - schema.relationships.keys()
+        if invalid_keys:
+            attrs = ', '.join(sorted(invalid_keys))
+            raise ModelKeyError(f'Attributes {attrs} don\'t exist')
+
+        # Relationships are replaced with their foreign key columns
+        rel_columns = {}
+        for key in keys & schema.relationships.keys():
+            prop = mapper.relationships[key]
+            if prop.direction is not MANYTOONE:
+                raise ModelKeyError(f'Relationship {key} can\'t be set in '
+                                    f'bulk')
+
+            rel_columns[key] = [
+                (mapper.get_property_by_column(local).key,
+                 prop.mapper.get_property_by_column(remote).key)
+                for local, remote in prop.local_remote_pairs
+            ]
+
+        required_keys = set()
+        for key in schema.required_keys:
+            if key in schema.relationships:
+                required_keys |= {mapper.get_property_by_column(column).key
+                                  for column in schema.relationships[key]}
+            else:
+                required_keys.add(key)
+
+        required_keys -= {'id_', 'created_date', 'modified_date'}
+        # Missing columns with a default get it
+        default_keys = cls.__get_column_defaults().keys()
+
+        # The validators may hash or normalize values, they must not be
+        # skipped
+        validators = {key: method for key, (method, _) in
+                      mapper.validators.items() if key in keys}
+        instance = mapper.class_manager.new_instance() if validators else None
+
+        results = []
+        for row in rows:
+            row = dict(row)
+
+            for key, method in validators.items():
+                if key in row:
+                    row[key] = method(instance, key, row[key])
+
+            for key, pairs in rel_columns.items():
+                if key in row:
+                    obj = row.pop(key)
+                    for attr, remote_attr in pairs:
+                        row[attr] = getattr(obj, remote_attr) if obj else None
+
+            missing_keys = {k for k in required_keys & row.keys()
+                            if row[k] is None or row[k] == ''}
+            if check_missing:
+                missing_keys |= required_keys - row.keys() - default_keys
+
+            if missing_keys:
+                attrs = ', '.join(sorted(missing_keys))
+                raise ModelKeyError(f'Attributes {attrs} can\'t be null or '
+                                    f'empty')
+
+            results.append(row)
+
+        return results
+
+    @staticmethod
+    def __group_bulk_rows(rows):
+        # A multi-row statement needs the same set of columns in every row
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row.keys())), []).append(row)
+
+        return groups.items()
+
+    @staticmethod
+    def __get_chunks(rows, chunk_size):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    @classmethod
+    def get_load_options(cls, include: set = None, columns: dict = None,
+                         entity=None):
+        # The entity is an alias of the model when it's selected from a
+        # subquery
+        entity = entity or cls
+        columns = columns or {}
+        options = []
+
+        def load_only_option(model, path):
+            model_columns = columns.get(model.__table__.name.lower())
+            if not model_columns:
+                return None
+
+            source = entity if not path else model
+            attrs = [getattr(source, column) for column in model_columns]
+            if not path:
+                return load_only(*attrs)
+
+            loader = defaultload(path[0])
+            for attr_ in path[1:]:
+                loader = loader.defaultload(attr_)
+
+            return loader.load_only(*attrs)
+
+        option = load_only_option(cls, [])
+        if option is not None:
+            options.append(option)
+
+        for path in sorted(include or ()):
+            model, loader, attrs_path = cls, None, []
+
+            for key in path.split('.'):
+                prop = inspect(model).relationships.get(key)
+                if prop is None:
+                    raise ModelKeyError(f'Relationship {key} doesn\'t exist')
+
+                # Dynamic relationships can't be loaded eagerly, they are
+                # queried separately
+                if prop.lazy == 'dynamic':
+                    break
+
+                attr = getattr(entity if loader is None else model, key)
+                if prop.uselist:
+                    loader = selectinload(attr) if loader is None \
+                        else loader.selectinload(attr)
+                else:
+                    loader = joinedload(attr) if loader is None \
+                        else loader.joinedload(attr)
+
+                model = prop.mapper.class_
+                attrs_path.append(attr)
+
+                option = load_only_option(model, attrs_path)
+                if option is not None:
+                    options.append(option)
+
+            if loader is not None:
+                options.append(loader)
+
+        return options
+
     @classmethod
     def get_sort_fields(cls, sort: str = None):
         if not sort:
@@ -216,7 +648,7 @@ class BaseModel(declarative_base()):
                 'column': func or item,
             })
 
-        if sort_cols & cls.available_columns != sort_cols:
+        if sort_cols & cls.schema.columns != sort_cols:
             raise ModelKeyError
 
         order_fields = []
@@ -236,6 +668,14 @@ class BaseModel(declarative_base()):
         return order_fields
 
 
+@event.listens_for(Mapper, 'after_configured')
+def build_model_schemas():
+    # Newly configured mappers may add backrefs to the existing ones, so all
+    # the schemas are rebuilt
+    for mapper in BaseModel.registry.mappers:
+        setattr(mapper.class_, '_schema', ModelSchema(mapper.class_))
+
+
 def import_models():
     models = [__package__] + \
              [mvapi.web.models.__package__] + \
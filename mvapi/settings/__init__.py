@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 
 from mvapi.libs.exceptions import NoSettingsModuleSpecified
 from mvapi.libs.misc import import_object
+from mvapi.settings.loader import Settings
 
 
 def get_settings():
@@ -23,10 +24,10 @@ def get_settings():
             'Path to settings module is not found'
         )
 
-    settings_obj = import_object(app_settings)
-    settings_obj.APP_NAME = app_settings.partition('.')[0]
+    settings_cls = import_object(app_settings)
+    settings_cls.APP_NAME = app_settings.partition('.')[0]
 
-    return settings_obj()
+    return Settings(settings_cls)
 
 
 settings = get_settings()
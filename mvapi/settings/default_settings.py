@@ -1,23 +1,55 @@
-import os
 import sys
 
 
 class DefaultSettings:
+    # Environment variables coerced to the types of the defaults, they are
+    # set by the settings loader
+    overrides = None
+    # Other types a setting accepts from the environment
+    types = {'SYSLOG': (bool, str)}
+
     API_LOGGER_NAME = 'api'
     BLUEPRINTS = []
     CONVERTERS = []
+    DB_EXECUTEMANY_MODE = None
+    DB_MAX_OVERFLOW = 10
+    DB_POOL_PRE_PING = False
+    DB_POOL_RECYCLE = -1
+    DB_POOL_SIZE = 5
+    DB_POOL_TIMEOUT = 30
+    DB_POOL_USE_LIFO = False
+    DB_REPLICA_BALANCING = 'round_robin'
+    DB_REPLICA_STICKINESS = 5
+    DB_REPLICA_STICKY_USERS = 1000
+    DB_REPLICA_URIS = []
+    DB_STATEMENT_TIMEOUT = 0
     DEBUG = False
     DEBUG_SQL = False
     EMAILS_MODULE = None
     ENV = 'production'
     ERRORS_PATH = '.errors'
     EXTENSIONS = []
+    JSON_BACKEND = 'json'
     JWTAUTH_SETTINGS = {}
     LIMIT = 15
+    LOGGING_QUEUE = False
+    LOGGING_QUEUE_SIZE = 10000
     MIGRATIONS_EXCLUDE_TABLES = tuple()
     MODELS = []
+    PASSWORD_HASH_FAST = False
+    PASSWORD_HASH_QUEUE = 16
+    PASSWORD_HASH_ROUNDS = 12
+    PASSWORD_HASH_WORKERS = 4
+    RENDER_CACHE_SIZE = 0
     SERIALIZERS = []
+    SESSIONS_LAST_SEEN_BUFFER = 10000
+    SESSIONS_LAST_SEEN_INTERVAL = 0
+    SESSIONS_PRUNE_BATCH_SIZE = 1000
+    SESSIONS_PRUNE_INTERVAL = 0
+    SESSIONS_PRUNE_SLEEP = 0.1
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    STREAM_BATCH_SIZE = 100
+    STREAM_THRESHOLD = 0
     SYSLOG = False
     TEMPLATE_LOADERS = {}
     VIEWS = []
@@ -93,6 +125,7 @@ class DefaultSettings:
         return self.APP_NAME
 
     def __getattribute__(self, name):
-        if name in os.environ:
-            return os.environ[name]
+        overrides = super(DefaultSettings, self).__getattribute__('overrides')
+        if overrides and name in overrides:
+            return overrides[name]
         return super(DefaultSettings, self).__getattribute__(name)
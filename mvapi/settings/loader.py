@@ -0,0 +1,126 @@
+import inspect
+import json
+import os
+from copy import deepcopy
+
+from blinker import signal
+
+from mvapi.libs.exceptions import InvalidSettingError
+
+settings_reloaded = signal('mvapi.settings_reloaded')
+
+TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+FALSE_VALUES = {'0', 'false', 'no', 'off', ''}
+
+
+def coerce_value(name, value, default, types=()):
+    try:
+        if isinstance(default, bool):
+            if value.lower() in TRUE_VALUES:
+                return True
+            if value.lower() in FALSE_VALUES:
+                return False
+            # Settings such as SYSLOG take a string instead of a flag too
+            if str in types:
+                return value
+            raise ValueError
+
+        if isinstance(default, int):
+            return int(value)
+
+        if isinstance(default, float):
+            return float(value)
+
+        if isinstance(default, dict):
+            result = json.loads(value)
+            if type(result) is not dict:
+                raise ValueError
+            return result
+
+        if isinstance(default, (list, tuple)):
+            try:
+                result = json.loads(value)
+            except ValueError:
+                result = [item.strip() for item in value.split(',')
+                          if item.strip()]
+
+            if type(result) is not list:
+                raise ValueError
+            return type(default)(result)
+
+    except ValueError:
+        raise InvalidSettingError(f'Environment variable {name} must be '
+                                  f'{type(default).__name__}')
+
+    return value
+
+
+def load_settings(settings_cls):
+    types = settings_cls.types or {}
+
+    overrides = {}
+    for name, value in os.environ.items():
+        if not (name.isidentifier() and name.isupper()):
+            continue
+
+        default = inspect.getattr_static(settings_cls, name, None)
+        if isinstance(default, property):
+            default = None
+
+        overrides[name] = coerce_value(name, value, default,
+                                       types.get(name, ()))
+
+    settings_obj = settings_cls()
+    settings_obj.overrides = overrides
+
+    # Only the declared settings are resolved, other environment variables
+    # are read through the settings object and don't get into the app config
+    values = {}
+    for name in dir(settings_cls):
+        if not name.isupper():
+            continue
+
+        try:
+            value = getattr(settings_obj, name)
+        except AttributeError:
+            continue
+
+        if isinstance(value, (dict, list)):
+            value = deepcopy(value)
+
+        values[name] = value
+
+    return settings_obj, values
+
+
+class Settings:
+    def __init__(self, settings_cls):
+        object.__setattr__(self, '_Settings__settings_cls', settings_cls)
+        self.__load()
+
+    def __getattr__(self, name):
+        # Undeclared environment variables and the helpers of the settings
+        # class
+        if name.startswith('_Settings__'):
+            raise AttributeError(name)
+        return getattr(self.__settings_obj, name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Settings are read-only')
+
+    def __delattr__(self, name):
+        raise AttributeError('Settings are read-only')
+
+    def __load(self):
+        settings_obj, values = load_settings(self.__settings_cls)
+        object.__setattr__(self, '_Settings__settings_obj', settings_obj)
+
+        for name in [k for k in self.__dict__ if k.isupper()]:
+            if name not in values:
+                del self.__dict__[name]
+
+        self.__dict__.update(values)
+
+    def reload(self):
+        self.__load()
+        settings_reloaded.send(self)
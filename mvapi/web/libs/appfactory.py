@@ -1,5 +1,4 @@
 import importlib
-import json
 import time
 
 from flask import Flask, g, request
@@ -7,15 +6,21 @@ from werkzeug.exceptions import HTTPException
 
 from mvapi.libs.database import db
 from mvapi.libs.error import save_error
-from mvapi.libs.exceptions import ModelKeyError, NotFoundError
+from mvapi.libs.exceptions import ModelKeyError, NotFoundError, \
+    ReadOnlySessionError
 from mvapi.libs.misc import import_object
 from mvapi.settings import settings
 from mvapi.web.libs.exceptions import AccessDeniedError, AppException, \
     AppValueError, BadRequestError, NoConverterException, \
-    NoExtensionException, NotAllowedError, UnauthorizedError, \
-    UnexpectedArgumentsError
+    NoExtensionException, NotAllowedError, ServiceUnavailableError, \
+    UnauthorizedError, UnexpectedArgumentsError
+from mvapi.web.libs.jsonbackend import dumps
 from mvapi.web.libs.jsonwebtoken import JSONWebToken, JWTError
+from mvapi.web.libs.lastseen import last_seen_buffer
 from mvapi.web.libs.logger import logger
+from mvapi.web.libs.sessionpruner import session_pruner
+
+PRIMARY_COOKIE = 'mvapi_primary_until'
 
 
 class AppFactory:
@@ -92,6 +97,9 @@ class AppFactory:
 def create_app():
     app = AppFactory().app
 
+    if settings.SESSIONS_PRUNE_INTERVAL:
+        session_pruner.start(settings.SESSIONS_PRUNE_INTERVAL)
+
     if settings.DEBUG:
         @app.before_request
         def before_request():
@@ -106,9 +114,10 @@ def create_app():
 
     @app.teardown_appcontext
     def teardown_appcontext(exception):
+        # Closing the session rolls back a read only transaction
         if exception:
             db.session.rollback()
-        else:
+        elif not db.read_only:
             db.session.commit()
 
         db.session.remove()
@@ -135,7 +144,11 @@ def create_app():
                 'status': str(status)
             }
 
-            return json.dumps(data), status, {
+            source = getattr(exc, 'source', None)
+            if source:
+                data['source'] = source
+
+            return dumps(data), status, {
                 'Content-Type': 'application/json; charset=utf-8'
             }
         else:
@@ -159,9 +172,17 @@ def create_app():
         if isinstance(exc, (NotFoundError, UnexpectedArgumentsError,)):
             return app_error_response(exc, 404, 'Not found')
 
+        if isinstance(exc, ReadOnlySessionError):
+            # It's a view that writes on a safe method
+            logger.warning(f'{request.method} {request.path}: {exc}')
+            return app_error_response(exc, 405, 'Method not allowed')
+
         if isinstance(exc, NotAllowedError):
             return app_error_response(exc, 405, 'Method not allowed')
 
+        if isinstance(exc, ServiceUnavailableError):
+            return app_error_response(exc, 503, 'Service unavailable')
+
         if isinstance(exc, HTTPException):
             return app_error_response(exc, exc.code, exc.name)
 
@@ -171,6 +192,11 @@ def create_app():
     def get_current_user():
         g.current_user = None
 
+        read_only = request.method in ('GET', 'HEAD')
+        primary_until = request.cookies.get(PRIMARY_COOKIE)
+        db.set_read_only(read_only, primary_until=primary_until)
+        db.set_statement_timeout(settings.DB_STATEMENT_TIMEOUT)
+
         header = request.headers.get('Authorization')
         if not header:
             return None
@@ -189,4 +215,21 @@ def create_app():
         except (NotFoundError, JWTError):
             return None
 
+        last_seen_buffer.touch(jwt.session_id)
+
+        db.set_read_only(read_only, user_id=g.current_user.id_,
+                         primary_until=primary_until)
+
+    @app.after_request
+    def keep_reading_from_primary(response):
+        # The cookie only makes the client read from the primary database,
+        # other workers than the one it has written through see it too
+        sticky_until = db.sticky_until
+        if sticky_until:
+            response.set_cookie(PRIMARY_COOKIE, str(sticky_until),
+                                max_age=settings.DB_REPLICA_STICKINESS,
+                                httponly=True)
+
+        return response
+
     return app
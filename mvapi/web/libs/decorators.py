@@ -2,6 +2,7 @@ from functools import wraps
 
 from flask import g
 
+from mvapi.libs.database import db
 from mvapi.libs.exceptions import NotFoundError
 from mvapi.settings import settings
 from mvapi.web.libs.exceptions import AccessDeniedError, UnauthorizedError
@@ -30,6 +31,18 @@ def admin_required(func):
     return decorated_view
 
 
+def statement_timeout(timeout):
+    def decorator(func):
+        @wraps(func)
+        def decorated_view(*args, **kwargs):
+            db.set_statement_timeout(timeout)
+            return func(*args, **kwargs)
+
+        return decorated_view
+
+    return decorator
+
+
 def debug_only(func):
     @wraps(func)
     def decorated_view(*args, **kwargs):
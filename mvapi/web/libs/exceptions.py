@@ -35,6 +35,10 @@ class NotAllowedError(AppException):
     pass
 
 
+class ServiceUnavailableError(AppException):
+    pass
+
+
 class UnauthorizedError(AppException):
     pass
 
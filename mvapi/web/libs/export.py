@@ -0,0 +1,66 @@
+import csv
+import io
+
+from mvapi.web.libs.jsonbackend import dumps
+from mvapi.web.libs.misc import JSONEncoder
+
+
+class NDJSONWriter:
+    mimetype = 'application/x-ndjson'
+
+    def write(self, rows) -> bytes:
+        return b''.join(dumps(row) + b'\n' for row in rows)
+
+
+# The columns are the keys of the first rows, nested values are JSON encoded
+class CSVWriter:
+    mimetype = 'text/csv'
+
+    def __init__(self):
+        self.__columns = None
+        self.__default = JSONEncoder().default
+
+    def write(self, rows) -> bytes:
+        if not rows:
+            return b''
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        if self.__columns is None:
+            self.__columns = []
+            for row in rows:
+                self.__columns += [key for key in row
+                                   if key not in self.__columns]
+            writer.writerow(self.__columns)
+
+        for row in rows:
+            writer.writerow([self.__cell(row.get(column))
+                             for column in self.__columns])
+
+        return buffer.getvalue().encode()
+
+    def __cell(self, value):
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+
+        if isinstance(value, (dict, list, tuple)):
+            return dumps(value).decode()
+
+        return self.__default(value)
+
+
+EXPORT_WRITERS = {
+    writer.mimetype: writer for writer in (NDJSONWriter, CSVWriter)
+}
+
+
+def get_export_writer(accept_mimetypes):
+    mimetype = accept_mimetypes.best_match([
+        'application/vnd.api+json',
+        'application/json',
+        *EXPORT_WRITERS.keys(),
+    ])
+
+    writer_cls = EXPORT_WRITERS.get(mimetype)
+    return writer_cls() if writer_cls else None
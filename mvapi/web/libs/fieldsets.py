@@ -0,0 +1,73 @@
+import ast
+import inspect
+import textwrap
+from functools import lru_cache
+
+
+# Finds the item attributes render_attributes reads, nothing is known if the
+# item itself is passed somewhere
+class AttributeColumnsVisitor(ast.NodeVisitor):
+    def __init__(self):
+        self.attributes = set()
+        self.opaque = False
+
+    @staticmethod
+    def __is_item(node):
+        return (isinstance(node, ast.Attribute) and node.attr == 'item' and
+                isinstance(node.value, ast.Name) and node.value.id == 'self')
+
+    def visit_Attribute(self, node):
+        if self.__is_item(node.value):
+            self.attributes.add(node.attr)
+        elif self.__is_item(node):
+            self.opaque = True
+        else:
+            self.generic_visit(node)
+
+
+def get_attribute_columns(serializer_cls):
+    visitor = AttributeColumnsVisitor()
+
+    for cls in serializer_cls.__mro__:
+        func = cls.__dict__.get('render_attributes')
+        if func is None:
+            continue
+
+        try:
+            source = textwrap.dedent(inspect.getsource(func))
+        except (OSError, TypeError):
+            return None
+
+        visitor.visit(ast.parse(source))
+
+    if visitor.opaque:
+        return None
+
+    return visitor.attributes
+
+
+@lru_cache(maxsize=1024)
+def get_fieldset_columns(serializer_cls, model, fields: frozenset):
+    attribute_columns = get_attribute_columns(serializer_cls)
+    if attribute_columns is None:
+        return None
+
+    schema = model.schema
+
+    # Anything else may be a property reading any columns
+    if attribute_columns - schema.columns - schema.relationships.keys():
+        return None
+
+    # The columns render_attributes reads are loaded whether their keys are
+    # requested or not. Any other column, e.g. one a helper method reads, is
+    # deferred and loaded when it's used.
+    columns = {'id_', *model.change_date_columns}
+    columns |= attribute_columns & schema.columns
+    columns |= {column for column, _ in schema.linkage.values()}
+    columns |= schema.foreign_keys.keys() & schema.columns
+    columns |= fields & schema.columns
+
+    if columns >= schema.columns:
+        return None
+
+    return frozenset(columns)
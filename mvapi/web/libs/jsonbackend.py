@@ -0,0 +1,95 @@
+import json
+from functools import lru_cache
+
+from flask import request
+from werkzeug.exceptions import BadRequest
+
+from mvapi.settings import settings
+from mvapi.web.libs.logger import logger
+from mvapi.web.libs.misc import JSONEncoder
+
+
+class JSONBackend:
+    name = 'json'
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(obj, cls=JSONEncoder).encode()
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+# Naive datetimes are treated as UTC ones like JSONEncoder does
+class ORJSONBackend(JSONBackend):
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+
+        self.__orjson = orjson
+        self.__option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+        self.__default = JSONEncoder().default
+
+    def dumps(self, obj) -> bytes:
+        return self.__orjson.dumps(obj, default=self.__default,
+                                   option=self.__option)
+
+    def loads(self, data):
+        return self.__orjson.loads(data)
+
+
+class UJSONBackend(JSONBackend):
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+
+        self.__ujson = ujson
+        self.__default = JSONEncoder().default
+
+    def dumps(self, obj) -> bytes:
+        return self.__ujson.dumps(obj, default=self.__default,
+                                  escape_forward_slashes=False).encode()
+
+    def loads(self, data):
+        return self.__ujson.loads(data)
+
+
+JSON_BACKENDS = {
+    backend.name: backend
+    for backend in (JSONBackend, ORJSONBackend, UJSONBackend)
+}
+
+
+@lru_cache(maxsize=None)
+def get_json_backend(name=None) -> JSONBackend:
+    name = name or settings.JSON_BACKEND
+
+    backend_cls = JSON_BACKENDS.get(name)
+    if not backend_cls:
+        raise ValueError(f'JSON backend {name} is not supported')
+
+    try:
+        return backend_cls()
+    except ImportError:
+        logger.warning(f'JSON backend {name} is not installed, the standard '
+                       f'library json is used')
+        return JSONBackend()
+
+
+def dumps(obj) -> bytes:
+    return get_json_backend(settings.JSON_BACKEND).dumps(obj)
+
+
+def loads(data):
+    return get_json_backend(settings.JSON_BACKEND).loads(data)
+
+
+def get_request_json():
+    if not request.is_json:
+        return None
+
+    try:
+        return loads(request.get_data(cache=True))
+    except ValueError:
+        raise BadRequest('Failed to decode JSON object')
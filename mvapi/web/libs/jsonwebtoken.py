@@ -2,15 +2,23 @@ from datetime import datetime, timedelta
 
 import jwt
 
+from mvapi.libs.database import db
+from mvapi.libs.exceptions import NotFoundError
 from mvapi.settings import settings
 from mvapi.web.libs.exceptions import JWTError
 from mvapi.web.libs.misc import JSONEncoder
+from mvapi.web.libs.revocation import revocation_list
+from mvapi.web.libs.sessioncache import restore_user, session_cache
 from mvapi.web.models.session import Session
+from mvapi.web.models.user import User
 
 
 class JSONWebToken:
     token_type = 'Bearer'
     expires = None
+    access_expires = None
+    stateless = False
+    session_id = None
 
     __algorithm = None
     __secret_key = None
@@ -29,6 +37,15 @@ class JSONWebToken:
             days = jwt_settings.get('EXPIRES', 365)
             self.expires = self.__get_expires(days=days)
 
+        self.stateless = jwt_settings.get('STATELESS', False)
+        self.access_expires = self.expires
+
+        if self.stateless:
+            seconds = jwt_settings.get('ACCESS_EXPIRES', 900)
+            self.access_expires = min(
+                self.expires, datetime.utcnow() + timedelta(seconds=seconds)
+            )
+
     def __decode_token(self, token):
         return jwt.decode(
             token, self.__secret_key, algorithms=[self.__algorithm]
@@ -37,17 +54,12 @@ class JSONWebToken:
     def __get_expires(self, days=0, hours=0):
         return self.__expires_from + timedelta(days=days, hours=hours)
 
-    def get_token(self, session: Session):
-        payload = {
-            'session_id': session.id_,
-            'exp': self.expires
-        }
-
+    def __encode_token(self, payload):
         return jwt.encode(payload, key=self.__secret_key,
                           algorithm=self.__algorithm,
                           json_encoder=JSONEncoder)
 
-    def get_user(self, token):
+    def __get_payload(self, token, token_type=None):
         try:
             payload = self.__decode_token(token)
 
@@ -57,9 +69,76 @@ class JSONWebToken:
         except jwt.DecodeError:
             raise JWTError('Error decoding token')
 
-        session_id = payload.get('session_id')
-        if not session_id:
+        if not payload.get('session_id') or \
+                payload.get('type') != token_type:
             raise JWTError('Invalid payload')
 
-        session = Session.query.get(session_id)
-        return session.user
+        return payload
+
+    def get_token(self, session: Session):
+        payload = {
+            'session_id': session.id_,
+            'exp': self.access_expires
+        }
+
+        if self.stateless:
+            payload.update({
+                'user_id': session.user_id,
+                'is_admin': session.user.is_admin,
+                'ver': session.version or 1,
+            })
+
+        return self.__encode_token(payload)
+
+    def get_refresh_token(self, session: Session):
+        return self.__encode_token({
+            'session_id': session.id_,
+            'type': 'refresh',
+            'exp': self.expires
+        })
+
+    def get_session(self, refresh_token):
+        payload = self.__get_payload(refresh_token, token_type='refresh')
+
+        try:
+            session = Session.query.get(payload['session_id'])
+        except NotFoundError:
+            raise JWTError('Session not found')
+
+        if session.revoked_date:
+            raise JWTError('Session is revoked')
+
+        return session
+
+    def get_user(self, token):
+        payload = self.__get_payload(token)
+        session_id = self.session_id = payload['session_id']
+
+        # The claims are trusted unless the session is revoked, the user is
+        # loaded only when its other attributes are used
+        if self.stateless and 'user_id' in payload:
+            if revocation_list.is_revoked(session_id, payload.get('ver', 1)):
+                raise JWTError('Session is revoked')
+
+            return restore_user(User, {'id_': payload['user_id'],
+                                       'is_admin': payload['is_admin']})
+
+        user = session_cache.get_user(session_id)
+        if user is None:
+            try:
+                session = Session.query.get(session_id)
+            except NotFoundError:
+                # A new session may be not replicated yet
+                if not db.session().reads_from_replica:
+                    raise
+
+                with db.primary():
+                    session = Session.query.get(session_id)
+
+            if session.revoked_date:
+                raise JWTError('Session is revoked')
+
+            user = session.user
+            session_cache.set_user(session_id, user)
+
+        return user
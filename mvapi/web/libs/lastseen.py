@@ -0,0 +1,127 @@
+import atexit
+import threading
+from datetime import datetime
+
+from sqlalchemy import bindparam, or_, update
+
+from mvapi.libs.database import db
+from mvapi.settings import settings
+from mvapi.web.libs.logger import logger
+from mvapi.web.models.session import Session
+
+
+class LastSeenBuffer:
+    def __init__(self):
+        self.__touches = {}
+        self.__lock = threading.Lock()
+        self.__flush_lock = threading.Lock()
+        self.__thread = None
+        self.__wake = threading.Event()
+
+        self.touched = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.written = 0
+
+    @property
+    def interval(self):
+        return settings.SESSIONS_LAST_SEEN_INTERVAL
+
+    @property
+    def max_size(self):
+        return settings.SESSIONS_LAST_SEEN_BUFFER
+
+    def touch(self, session_id):
+        if not self.interval:
+            return
+
+        now = datetime.utcnow()
+
+        with self.__lock:
+            self.touched += 1
+
+            if session_id in self.__touches:
+                self.coalesced += 1
+
+            elif len(self.__touches) >= self.max_size:
+                self.dropped += 1
+                self.__wake.set()
+                return
+
+            self.__touches[session_id] = now
+
+        self.__start()
+
+    def flush(self):
+        with self.__lock:
+            touches, self.__touches = self.__touches, {}
+
+        if not touches:
+            return 0
+
+        table = Session.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam('session_id'))
+            .where(or_(table.c.last_seen.is_(None),
+                       table.c.last_seen < bindparam('seen')))
+            # The modified date is kept, rendered sessions are cached by it
+            .values(last_seen=bindparam('seen'),
+                    modified_date=table.c.modified_date)
+        )
+
+        # The engine is used directly, the ORM session's events don't need
+        # to know about it
+        with self.__flush_lock, db.session.get_bind().begin() as connection:
+            connection.execute(statement, [
+                {'session_id': session_id, 'seen': seen}
+                for session_id, seen in touches.items()
+            ])
+
+        self.flushes += 1
+        self.written += len(touches)
+        return len(touches)
+
+    def stats(self):
+        return {
+            'touched': self.touched,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'flushes': self.flushes,
+            'written': self.written,
+            'size': len(self.__touches),
+            'max_size': self.max_size,
+        }
+
+    def __start(self):
+        if self.__thread:
+            return
+
+        with self.__lock:
+            if self.__thread:
+                return
+
+            self.__thread = threading.Thread(target=self.__run,
+                                             name='last-seen-writer',
+                                             daemon=True)
+            self.__thread.start()
+            atexit.register(self.__flush_safely)
+
+    def __run(self):
+        while True:
+            self.__wake.wait(self.interval)
+            self.__wake.clear()
+            self.__flush_safely()
+
+    def __flush_safely(self):
+        try:
+            self.flush()
+        except Exception as exc:
+            logger.error(f'Failed to write last seen times: {exc}',
+                         exc_info=True)
+        finally:
+            db.session.remove()
+
+
+last_seen_buffer = LastSeenBuffer()
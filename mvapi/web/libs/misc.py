@@ -1,6 +1,7 @@
 import enum
 import json
 from datetime import date, datetime, timezone
+from itertools import islice
 from uuid import UUID
 
 from flask import request, url_for as uf
@@ -73,6 +74,37 @@ def url_for(endpoint, **kwargs):
     return uf(endpoint, **kwargs)
 
 
+# Possibly only the first page of the related items
+class IncludedItems(list):
+    count = 0
+
+
+# The count and the last item are known once all the batches are taken
+class StreamedItems:
+    def __init__(self, query, batch_size, pagination=None):
+        self.query = query
+        self.batch_size = batch_size
+        self.pagination = pagination
+        self.count = 0
+        self.last = None
+
+    def __len__(self):
+        return self.count
+
+    def batches(self):
+        items = iter(self.query.yield_per(self.batch_size))
+
+        while True:
+            batch = list(islice(items, self.batch_size))
+            if not batch:
+                return
+
+            self.count += len(batch)
+            self.last = batch[-1]
+
+            yield batch
+
+
 class ApiResponse:
     __next_page = None
 
@@ -85,6 +117,8 @@ class ApiResponse:
     relationship_type = None
     related_relationship_type = None
     return_fields = None
+    include = None
+    include_limits = None
 
     def __init__(self, **kwargs):
         for k, v in kwargs.items():
@@ -95,7 +129,7 @@ class ApiResponse:
 
     @property
     def next_page(self):
-        if type(self.data) is list:
+        if isinstance(self.data, (list, StreamedItems)):
             if self.limit and \
                     not self.__next_page and \
                     len(self.data) == self.limit:
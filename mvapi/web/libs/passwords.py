@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from mvapi.settings import settings
+from mvapi.web.libs.exceptions import ServiceUnavailableError
+
+# The least cost bcrypt allows, for test suites
+FAST_ROUNDS = 4
+
+
+class PasswordHasher:
+    def __init__(self):
+        self.__executor = None
+        self.__slots = None
+        self.__lock = threading.Lock()
+
+        self.rejected = 0
+
+    @property
+    def fast(self):
+        return settings.PASSWORD_HASH_FAST
+
+    @property
+    def rounds(self):
+        return FAST_ROUNDS if self.fast else settings.PASSWORD_HASH_ROUNDS
+
+    def hash(self, password) -> str:
+        hashed = self.__run(bcrypt.hashpw, password.encode(),
+                            bcrypt.gensalt(rounds=self.rounds))
+        return hashed.decode()
+
+    def verify(self, password, hashed) -> bool:
+        if not hashed:
+            return False
+        return self.__run(bcrypt.checkpw, password.encode(), hashed.encode())
+
+    def needs_rehash(self, hashed) -> bool:
+        try:
+            rounds = int(hashed.split('$')[2])
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+        return rounds != self.rounds
+
+    def stats(self):
+        return {
+            'workers': settings.PASSWORD_HASH_WORKERS,
+            'queue_size': settings.PASSWORD_HASH_QUEUE,
+            'rejected': self.rejected,
+        }
+
+    def __run(self, func, *args):
+        if self.fast:
+            return func(*args)
+
+        executor, slots = self.__get_executor()
+
+        if not slots.acquire(blocking=False):
+            self.rejected += 1
+            raise ServiceUnavailableError('Too many password checks, try '
+                                          'again later')
+
+        try:
+            return executor.submit(func, *args).result()
+        finally:
+            slots.release()
+
+    def __get_executor(self):
+        with self.__lock:
+            if self.__executor is None:
+                workers = settings.PASSWORD_HASH_WORKERS
+                self.__executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix='password-hasher'
+                )
+                self.__slots = threading.BoundedSemaphore(
+                    workers + settings.PASSWORD_HASH_QUEUE
+                )
+
+        return self.__executor, self.__slots
+
+
+password_hasher = PasswordHasher()
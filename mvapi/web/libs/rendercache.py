@@ -0,0 +1,62 @@
+import threading
+from collections import OrderedDict
+
+from mvapi.settings import settings
+
+
+class RenderCache:
+    def __init__(self):
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_size(self):
+        return settings.RENDER_CACHE_SIZE
+
+    def get(self, key):
+        with self.__lock:
+            attributes = self.__entries.get(key)
+
+            if attributes is None:
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+
+        return attributes
+
+    def set(self, key, attributes):
+        if not self.max_size:
+            return
+
+        with self.__lock:
+            self.__entries[key] = attributes
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'size': len(self.__entries),
+            'max_size': self.max_size,
+        }
+
+
+render_cache = RenderCache()
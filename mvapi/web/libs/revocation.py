@@ -0,0 +1,142 @@
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, inspect, or_, select, update
+
+from mvapi.libs.database import db
+from mvapi.settings import settings
+from mvapi.web.libs.logger import logger
+from mvapi.web.models.session import Session
+from mvapi.web.models.user import User
+
+REVOKED = math.inf
+
+
+# Only sessions changed within the access token lifetime are held, older tokens
+# have expired anyway
+class RevocationList:
+    def __init__(self):
+        self.__versions = {}
+        self.__local = {}
+        self.__refreshed = None
+        self.__thread = None
+        self.__lock = threading.Lock()
+
+    @property
+    def access_expires(self):
+        return settings.JWTAUTH_SETTINGS.get('ACCESS_EXPIRES', 900)
+
+    @property
+    def refresh_interval(self):
+        return settings.JWTAUTH_SETTINGS.get('REVOCATION_REFRESH', 30)
+
+    def is_revoked(self, session_id, version):
+        # Only the first check waits for the list, a stale one is used while
+        # it's refreshed in the background
+        now = time.monotonic()
+        if self.__refreshed is None:
+            self.refresh()
+        elif now - self.__refreshed > self.refresh_interval:
+            self.__refresh_in_background()
+
+        least_version = self.__versions.get(session_id, 0)
+
+        local = self.__local.get(session_id)
+        if local and local[1] > now:
+            least_version = max(least_version, local[0])
+
+        return version < least_version
+
+    def revoke(self, session_id, version=REVOKED):
+        with self.__lock:
+            expires = time.monotonic() + self.access_expires
+            self.__local[session_id] = (version, expires)
+
+    def refresh(self):
+        with self.__lock:
+            now = time.monotonic()
+            if self.__refreshed is not None and \
+                    now - self.__refreshed <= self.refresh_interval:
+                return
+
+            # Other threads keep using the current list meanwhile
+            self.__refreshed = now
+
+        since = datetime.utcnow() - timedelta(seconds=self.access_expires)
+        rows = (db.session
+                .query(Session.id_, Session.version, Session.revoked_date)
+                .filter(Session.modified_date >= since,
+                        or_(Session.revoked_date.isnot(None),
+                            Session.version > 1))
+                .all())
+
+        versions = {
+            session_id: REVOKED if revoked_date else version
+            for session_id, version, revoked_date in rows
+        }
+
+        with self.__lock:
+            self.__versions = versions
+            self.__local = {key: value for key, value in self.__local.items()
+                            if value[1] > now}
+
+    def __refresh_in_background(self):
+        with self.__lock:
+            if self.__thread and self.__thread.is_alive():
+                return
+
+            self.__thread = threading.Thread(target=self.__run,
+                                             name='revocation-list',
+                                             daemon=True)
+            self.__thread.start()
+
+    def __run(self):
+        try:
+            self.refresh()
+        except Exception as exc:
+            db.session.rollback()
+            logger.error(f'Failed to refresh the revocation list: {exc}',
+                         exc_info=True)
+        finally:
+            db.session.remove()
+
+    def clear(self):
+        with self.__lock:
+            self.__versions = {}
+            self.__local = {}
+            self.__refreshed = None
+
+
+revocation_list = RevocationList()
+
+
+# noinspection PyUnusedLocal
+@event.listens_for(Session, 'after_update')
+def revoke_session(mapper, connection, target):
+    if target.revoked_date:
+        revocation_list.revoke(target.id_)
+
+
+# noinspection PyUnusedLocal
+@event.listens_for(User, 'after_update', propagate=True)
+def increment_session_versions(mapper, connection, target):
+    # Access tokens carry the admin flag, they are issued anew when it changes
+    if not inspect(target).attrs.is_admin.history.has_changes():
+        return
+
+    table = Session.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.user_id == target.id_)
+        .values(version=func.coalesce(table.c.version, 1) + 1,
+                modified_date=datetime.utcnow())
+    )
+
+    rows = connection.execute(
+        select(table.c.id, table.c.version)
+        .where(table.c.user_id == target.id_)
+    )
+    for session_id, version in rows:
+        revocation_list.revoke(session_id, version)
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from mvapi.libs.database import db
+from mvapi.settings import settings
+from mvapi.web.models.session import Session
+from mvapi.web.models.user import User
+
+
+def restore_user(user_cls, values):
+    # The other columns are loaded when they are used
+    user = user_cls.__mapper__.class_manager.new_instance()
+    for key, value in values.items():
+        set_committed_value(user, key, value)
+
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+# Other processes see changes of a session or user once the entry expires
+class SessionCache:
+    def __init__(self):
+        self.__entries = OrderedDict()
+        self.__user_sessions = {}
+        self.__lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_size(self):
+        return settings.JWTAUTH_SETTINGS.get('SESSION_CACHE_SIZE', 1024)
+
+    @property
+    def ttl(self):
+        return settings.JWTAUTH_SETTINGS.get('SESSION_CACHE_TTL', 60)
+
+    def get_user(self, session_id):
+        with self.__lock:
+            entry = self.__entries.get(session_id)
+
+            if entry and entry[0] < time.monotonic():
+                self.__drop(session_id)
+                entry = None
+
+            if not entry:
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(session_id)
+            self.hits += 1
+
+        _, user_cls, values = entry
+        return restore_user(user_cls, values)
+
+    def set_user(self, session_id, user):
+        if not self.max_size:
+            return
+
+        values = {key: getattr(user, key) for key in user.schema.columns}
+        entry = (time.monotonic() + self.ttl, user.__class__, values)
+
+        with self.__lock:
+            self.__drop(session_id)
+
+            self.__entries[session_id] = entry
+            self.__user_sessions.setdefault(user.id_, set()).add(session_id)
+
+            while len(self.__entries) > self.max_size:
+                self.__drop(next(iter(self.__entries)))
+                self.evictions += 1
+
+    def invalidate_session(self, session_id):
+        with self.__lock:
+            self.__drop(session_id)
+
+    def invalidate_user(self, user_id):
+        with self.__lock:
+            for session_id in self.__user_sessions.get(user_id, set()).copy():
+                self.__drop(session_id)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__user_sessions.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.__entries),
+            'max_size': self.max_size,
+        }
+
+    def __drop(self, session_id):
+        entry = self.__entries.pop(session_id, None)
+        if not entry:
+            return
+
+        user_id = entry[2]['id_']
+        user_sessions = self.__user_sessions.get(user_id)
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self.__user_sessions[user_id]
+
+
+session_cache = SessionCache()
+
+
+# noinspection PyUnusedLocal
+@event.listens_for(Session, 'after_update')
+@event.listens_for(Session, 'after_delete')
+def invalidate_session(mapper, connection, target):
+    session_cache.invalidate_session(target.id_)
+
+
+# noinspection PyUnusedLocal
+@event.listens_for(User, 'after_update', propagate=True)
+@event.listens_for(User, 'after_delete', propagate=True)
+def invalidate_user(mapper, connection, target):
+    session_cache.invalidate_user(target.id_)
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def invalidate_all(orm_execute_state):
+    # Bulk updates and deletes don't tell which rows they change
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if table is not None and table.name in (Session.__table__.name,
+                                            User.__table__.name):
+        session_cache.clear()
@@ -0,0 +1,148 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, or_, select
+
+from mvapi.libs.database import db
+from mvapi.settings import settings
+from mvapi.web.libs.logger import logger
+from mvapi.web.libs.sessioncache import session_cache
+from mvapi.web.models.session import Session
+
+# An arbitrary key of the PostgreSQL advisory lock held while pruning
+PRUNE_LOCK_KEY = 0x6d7661706970
+
+
+# Every batch is committed separately to keep the locks short
+class SessionPruner:
+    def __init__(self, batch_size=None, sleep=None):
+        self.__batch_size = batch_size
+        self.__sleep = sleep
+        self.__thread = None
+        self.__stop = threading.Event()
+
+    @property
+    def batch_size(self):
+        return self.__batch_size or settings.SESSIONS_PRUNE_BATCH_SIZE
+
+    @property
+    def sleep(self):
+        return settings.SESSIONS_PRUNE_SLEEP if self.__sleep is None \
+            else self.__sleep
+
+    @staticmethod
+    def __get_filter():
+        jwt_settings = settings.JWTAUTH_SETTINGS
+        now = datetime.utcnow()
+
+        expires = timedelta(days=jwt_settings.get('EXPIRES', 365))
+        access_expires = timedelta(
+            seconds=jwt_settings.get('ACCESS_EXPIRES', 900)
+        )
+
+        return or_(Session.created_date < now - expires,
+                   Session.revoked_date < now - access_expires)
+
+    def count(self):
+        return Session.query.filter(self.__get_filter()).count()
+
+    @staticmethod
+    @contextmanager
+    def __lock():
+        # Only one process prunes at a time on PostgreSQL, the others skip
+        # their turn, the lock is held by a connection of its own
+        engine = db.session.get_bind()
+        if engine.dialect.name != 'postgresql':
+            yield True
+            return
+
+        with engine.connect() as connection:
+            locked = connection.execute(
+                select(func.pg_try_advisory_lock(PRUNE_LOCK_KEY))
+            ).scalar()
+
+            try:
+                yield locked
+            finally:
+                if locked:
+                    connection.execute(
+                        select(func.pg_advisory_unlock(PRUNE_LOCK_KEY))
+                    )
+
+    def prune(self):
+        with self.__lock() as locked:
+            if not locked:
+                logger.info('Sessions are pruned by another process')
+                return 0, 0.0
+
+            return self.__prune()
+
+    def __prune(self):
+        start = time.perf_counter()
+        removed = 0
+        last_id = None
+
+        while not self.__stop.is_set():
+            query = db.session.query(Session.id_).filter(self.__get_filter())
+            if last_id is not None:
+                query = query.filter(Session.id_ > last_id)
+
+            query = query.order_by(Session.id_).limit(self.batch_size)
+            ids = [row.id_ for row in query]
+            if not ids:
+                break
+
+            # The sessions aren't deleted through the ORM session, so the
+            # session cache keeps the other entries
+            db.session.connection().execute(
+                delete(Session.__table__)
+                .where(Session.__table__.c.id.in_(ids))
+            )
+            db.session.commit()
+
+            for session_id in ids:
+                session_cache.invalidate_session(session_id)
+
+            removed += len(ids)
+            last_id = ids[-1]
+
+            elapsed = time.perf_counter() - start
+            logger.debug(f'Pruned {removed} sessions, '
+                         f'{removed / elapsed:.0f} per second')
+
+            if len(ids) < self.batch_size:
+                break
+
+            time.sleep(self.sleep)
+
+        return removed, time.perf_counter() - start
+
+    def start(self, interval):
+        if self.__thread:
+            return
+
+        self.__thread = threading.Thread(target=self.__run, args=(interval,),
+                                         name='session-pruner', daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop.set()
+
+    def __run(self, interval):
+        while not self.__stop.wait(interval):
+            try:
+                removed, elapsed = self.prune()
+                if removed:
+                    logger.info(f'Pruned {removed} sessions in '
+                                f'{elapsed:.1f}s')
+            except Exception as exc:
+                db.session.rollback()
+                logger.error(f'Failed to prune sessions: {exc}',
+                             exc_info=True)
+            finally:
+                db.session.remove()
+
+
+session_pruner = SessionPruner()
@@ -1,6 +1,9 @@
-from sqlalchemy import Column, ForeignKey, String
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
+from mvapi.libs.database import db
 from mvapi.models import BaseModel
 
 
@@ -9,5 +12,17 @@ class Session(BaseModel):
     user_agent: Column = Column(String)
     user_id: Column = Column(String, ForeignKey('user.id', ondelete='CASCADE'),
                              index=True, nullable=False)
+    # Stateless access tokens carry the version they were issued for, it's
+    # incremented when the claims they carry change
+    version: Column = Column(Integer, default=1, server_default='1')
+    revoked_date: Column = Column(DateTime, index=True)
+    # Written behind by the last seen buffer, it keeps the modified date
+    last_seen: Column = Column(DateTime)
+
+    change_date_columns = ('modified_date', 'last_seen')
 
     user = relationship('User', lazy='joined', uselist=False)
+
+    def revoke(self):
+        self.revoked_date = datetime.utcnow()
+        db.session.flush()
@@ -1,10 +1,10 @@
-import bcrypt
 from sqlalchemy import Boolean, Column, DateTime, String
 from sqlalchemy.orm import validates, relationship
 from validate_email import validate_email
 
 from mvapi.models import BaseModel, BaseQuery
 from mvapi.web.libs.exceptions import AppValueError
+from mvapi.web.libs.passwords import password_hasher
 
 
 class User(BaseModel):
@@ -38,10 +38,7 @@ class User(BaseModel):
     # noinspection PyUnusedLocal
     @validates('password')
     def validate_password(self, key, password):
-        hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-        return hashed.decode()
+        return password_hasher.hash(password)
 
     def passwords_matched(self, password):
-        if not self.password:
-            return False
-        return bcrypt.checkpw(password.encode(), self.password.encode())
+        return password_hasher.verify(password, self.password)
@@ -1,7 +1,9 @@
 import importlib
 import os
 
+from mvapi.models import BaseModel
 from mvapi.settings import settings
+from mvapi.web.libs.fieldsets import get_fieldset_columns
 from mvapi.web.serializers.base import BaseSerializer
 
 RESOURCE_SERIALIZERS = {}
@@ -22,3 +24,29 @@ def import_serializers():
                             issubclass(attr, BaseSerializer) and \
                             attr != BaseSerializer:
                         RESOURCE_SERIALIZERS[attr.resource_type] = attr
+
+    models = get_resource_models()
+    for serializer in RESOURCE_SERIALIZERS.values():
+        serializer.compile(model=models.get(serializer.resource_type))
+
+
+def get_resource_models():
+    return {mapper.class_.__table__.name.lower(): mapper.class_
+            for mapper in BaseModel.registry.mappers}
+
+
+def get_fieldsets_columns(return_fields):
+    models = get_resource_models()
+    results = {}
+
+    for type_, fields in (return_fields or {}).items():
+        serializer = RESOURCE_SERIALIZERS.get(type_)
+        model = models.get(type_)
+        if not serializer or not model:
+            continue
+
+        columns = get_fieldset_columns(serializer, model, frozenset(fields))
+        if columns:
+            results[type_] = columns
+
+    return results
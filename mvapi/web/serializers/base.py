@@ -1,14 +1,23 @@
 from collections import OrderedDict
 
+from flask import request
+from sqlalchemy import inspect
 from sqlalchemy.orm import Query
 
 from mvapi.models import BaseModel
-from mvapi.web.libs.misc import dict_value, url_for
+from mvapi.web.libs.misc import dict_value, IncludedItems, \
+    is_local_dev_host, url_for
+from mvapi.web.libs.rendercache import render_cache
 from mvapi.web.models.user import User
 
 
 class BaseSerializer:
     resource_type = None
+    # The rendered attributes are cached per audience if they depend only on
+    # the item's columns and the audience
+    cache_attributes = False
+    _render_plans: dict = None
+    _custom_links = False
     current_user: User = None
     item: BaseModel = None
     additional_relationships: set = None
@@ -27,57 +36,101 @@ class BaseSerializer:
         if type(self.return_fields) is not set:
             self.return_fields = set(self.return_fields)
 
-    def __render_relationships(self):
-        if not hasattr(self.item, 'available_relationships'):
-            return None
-
-        relationships = OrderedDict([])
-
-        keys = set(self.item.available_relationships.keys())
-        keys |= self.additional_relationships
-        keys -= self.exclude_relationships
-
-        if self.admin_relationships and \
-                not (self.current_user and self.current_user.is_admin):
-            keys -= self.admin_relationships
-
-        if self.return_fields:
-            keys &= self.return_fields
-
-        for key in sorted(keys, key=lambda k: k.lower()):
-            relationships[key] = OrderedDict()
-
-            rel_links = OrderedDict()
-
-            if key not in self.additional_relationships:
-                rel_links['self'] = url_for(
-                    'api.api_view',
-                    resource_type=self.item.plural_type,
-                    resource_id=self.item.id_,
-                    relationship_type=key
-                )
-
-            rel_links['related'] = url_for(
-                    'api.api_view',
-                    resource_type=self.item.plural_type,
-                    resource_id=self.item.id_,
-                    related_relationship_type=key
-            )
-
-            relationships[key]['links'] = rel_links
+    @classmethod
+    def compile(cls, model=None):
+        cls._render_plans = {}
+        cls._custom_links = cls.render_links is not BaseSerializer.render_links
+
+        if model is not None:
+            for is_admin in (False, True):
+                cls.__get_relationships_plan(model, is_admin)
+
+    @classmethod
+    def __get_relationships_plan(cls, model, is_admin):
+        if '_render_plans' not in cls.__dict__:
+            cls.compile()
+
+        plan_key = (model, is_admin)
+        if plan_key in cls._render_plans:
+            return cls._render_plans[plan_key]
+
+        plan = []
+
+        if hasattr(model, 'schema'):
+            schema = model.schema
+            additional_relationships = cls.additional_relationships or set()
+
+            keys = set(schema.relationships.keys())
+            keys |= additional_relationships
+            keys -= cls.exclude_relationships or set()
+
+            if not is_admin:
+                keys -= cls.admin_relationships or set()
+
+            for key in sorted(keys, key=lambda k: k.lower()):
+                plan.append((
+                    key,
+                    None if key in additional_relationships
+                    else f'/relationships/{key}',
+                    f'/{key}',
+                    key in schema.dynamic_relationships,
+                    schema.linkage.get(key)
+                ))
+
+        cls._render_plans[plan_key] = tuple(plan)
+        return cls._render_plans[plan_key]
+
+    def __render_relationships(self, plan, item_url):
+        relationships = {}
+        unloaded = inspect(self.item).unloaded
+
+        for key, self_suffix, related_suffix, dynamic, linkage in plan:
+            if self.return_fields and key not in self.return_fields:
+                continue
+
+            rel_links = {}
+            if self_suffix:
+                rel_links['self'] = item_url + self_suffix
+            rel_links['related'] = item_url + related_suffix
+
+            relationships[key] = {'links': rel_links}
+
+            # Not included relationships are not loaded, the linkage is built
+            # from the foreign key or omitted
+            if key in unloaded and not dynamic:
+                if linkage:
+                    column, type_ = linkage
+                    value = getattr(self.item, column)
+                    if value is not None:
+                        relationships[key]['data'] = {
+                            'type': type_,
+                            'id': value
+                        }
+                continue
+
+            # Dynamic relationships are loaded beforehand, building their
+            # queries is needless
+            if dynamic:
+                if not self.relationships:
+                    continue
+
+                path = f'{self.item.id_}.{key}'
+                items = dict_value(dict_=self.relationships, path=path)
+                if items is None:
+                    continue
+
+                relationships[key]['data'] = [self.__get_linkage(item)
+                                              for item in items]
+
+                if isinstance(items, IncludedItems):
+                    relationships[key]['meta'] = {'count': items.count}
+
+                continue
 
             attr: BaseModel = getattr(self.item, key, None)
             if attr:
                 if isinstance(attr, Query):
-                    if not self.relationships:
-                        continue
-
-                    path = f'{self.item.id_}.{key}'
-                    items = dict_value(dict_=self.relationships, path=path)
-                    if items is None:
-                        continue
-
-                    data = [self.__get_linkage(item) for item in items]
+                    continue
 
                 elif isinstance(attr, list):
                     attr_: list[BaseModel] = attr
@@ -94,35 +147,81 @@ class BaseSerializer:
         if not self.return_fields:
             return attributes
 
-        filtered_attributes = OrderedDict()
+        return {attr: value for attr, value in attributes.items()
+                if attr in self.return_fields}
 
-        for attr, value in attributes.items():
-            if attr in self.return_fields:
-                filtered_attributes[attr] = value
+    def get_audience(self):
+        if not self.current_user:
+            return 'anonymous'
 
-        return filtered_attributes
+        return 'admin' if self.current_user.is_admin else 'user'
 
     def render(self, item):
-        self.item = item
+        return self.render_many([item])[0]
+
+    def render_many(self, items, flat=False):
+        # Everything that doesn't depend on an item is found once for all of
+        # them
+        is_admin = bool(self.current_user and self.current_user.is_admin)
+        use_cache = self.cache_attributes and render_cache.max_size
+        fields = frozenset(self.return_fields)
+        scheme = 'http' if is_local_dev_host() else 'https'
+        models = {}
+        results = []
+
+        for item in items:
+            model = item.__class__
+
+            if model not in models:
+                cacheable = bool(
+                    use_cache and hasattr(item, 'schema') and
+                    item.schema.columns.issuperset(item.change_date_columns)
+                )
 
-        resp = OrderedDict([
-            ('type', self.item.type_),
-            ('id', self.item.id_)
-        ])
+                models[model] = (
+                    item.type_,
+                    f'{scheme}://{request.host}/api/{item.plural_type}/',
+                    self.__get_relationships_plan(model, is_admin),
+                    cacheable
+                )
+
+            type_, base_url, plan, cacheable = models[model]
+            item_url = base_url + str(item.id_)
+
+            self.item = item
+            resp = {'type': type_, 'id': item.id_}
+
+            attributes = cache_key = None
+            if cacheable:
+                cache_key = (self.__class__, type_, item.id_,
+                             item.change_dates, fields, self.get_audience())
+                attributes = render_cache.get(cache_key)
+
+            if attributes is None:
+                attributes = self.__filter_fields(self.render_attributes())
+
+                if cache_key:
+                    render_cache.set(cache_key, attributes)
+
+            if flat:
+                results.append({'id': item.id_, **(attributes or {})})
+                continue
+
+            if attributes:
+                resp['attributes'] = attributes
 
-        attributes = self.render_attributes()
-        if attributes:
-            resp['attributes'] = self.__filter_fields(attributes)
+            relationships = self.__render_relationships(plan, item_url)
+            if relationships:
+                resp['relationships'] = relationships
 
-        relationships = self.__render_relationships()
-        if relationships:
-            resp['relationships'] = relationships
+            links = self.render_links() if self._custom_links \
+                else {'self': item_url}
+            if links:
+                resp['links'] = links
 
-        links = self.render_links()
-        if links:
-            resp['links'] = links
+            results.append(resp)
 
-        return resp
+        return results
 
     def render_attributes(self):
         attrs = OrderedDict()
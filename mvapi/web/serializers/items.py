@@ -1,9 +1,9 @@
 from collections import OrderedDict
 
-import itertools
 from sqlalchemy.orm import Query
 
 from mvapi.models import BaseModel
+from mvapi.web.libs.misc import dict_value
 from mvapi.web.serializers import RESOURCE_SERIALIZERS
 
 
@@ -12,93 +12,132 @@ class ItemsSerializer:
     __relationships = None
     __current_user = None
     __return_fields = None
+    __include = None
+    __included_items = None
 
-    def __init__(self, response, relationships=None, current_user=None):
-        self.__items = response.data
+    def __init__(self, response, relationships=None, current_user=None,
+                 items=None):
+        self.__items = response.data if items is None else items
         self.__relationships = relationships
         self.__current_user = current_user
         self.__return_fields = response.return_fields or {}
+        self.__include = response.include or set()
 
     def render(self):
         results = OrderedDict()
 
         if type(self.__items) is list:
-            results['data'] = [
-                self.__serialize_item(item=item,
-                                      relationships=self.__relationships)
-                for item in self.__items
-            ]
+            results['data'] = self.__serialize_items(
+                items=self.__items, relationships=self.__relationships
+            )
 
         else:
             results['data'] = (
                 None if not self.__items
-                else self.__serialize_item(
-                    item=self.__items, relationships=self.__relationships
-                )
+                else self.__serialize_items(
+                    items=[self.__items], relationships=self.__relationships
+                )[0]
             )
 
-        included = self.__generate_included(items=self.__items,
-                                            relationships=self.__relationships)
+        included = self.__serialize_items(items=self.included_items())
         if included:
             results['included'] = included
 
         return results
 
-    def __serialize_item(self, item, relationships=None):
-        serializer = RESOURCE_SERIALIZERS.get(item.type_)
-        if not serializer:
-            return None
+    def render_rows(self):
+        items = self.__items
+        if items is None:
+            return []
 
-        ser_obj = serializer(
-            relationships=relationships,
-            return_fields=self.__return_fields.get(item.type_)
-        )
+        if type(items) is not list:
+            items = [items]
+
+        rows = self.__serialize_items(items=items, flat=True)
+        return [row for row in rows if row is not None]
+
+    def included_items(self):
+        if self.__included_items is None:
+            self.__included_items = self.__find_included(
+                items=self.__items, relationships=self.__relationships
+            )
 
-        ser_obj.current_user = self.__current_user
-        return ser_obj.render(item=item)
+        return self.__included_items
+
+    def __serialize_items(self, items, relationships=None, flat=False):
+        indexes = OrderedDict()
+        for idx, item in enumerate(items):
+            indexes.setdefault(item.type_, []).append(idx)
+
+        results = [None] * len(items)
+
+        for type_, type_indexes in indexes.items():
+            serializer = RESOURCE_SERIALIZERS.get(type_)
+            if not serializer:
+                continue
+
+            ser_obj = serializer(
+                relationships=relationships,
+                return_fields=self.__return_fields.get(type_)
+            )
 
-    def __generate_included(self, items, relationships):
-        if not (items or relationships):
+            ser_obj.current_user = self.__current_user
+            rendered = ser_obj.render_many(
+                [items[idx] for idx in type_indexes], flat=flat
+            )
+
+            for idx, value in zip(type_indexes, rendered):
+                results[idx] = value
+
+        return results
+
+    def __find_included(self, items, relationships):
+        if not (items and self.__include):
             return []
 
         if type(items) is not list:
             items = [items]
 
         data_ids = {item.id_ for item in items}
-        included = {}
+        included = OrderedDict()
+        paths = [path.split('.') for path in sorted(self.__include)]
 
         for item in items:
             if issubclass(item.__class__, BaseModel):
-                self.__include_items(item=item, included=included,
-                                     data_ids=data_ids)
+                for path in paths:
+                    self.__include_path(item=item, path=path,
+                                        included=included, data_ids=data_ids,
+                                        relationships=relationships)
+
+        return list(included.values())
 
-        relationships = relationships or {}
+    def __include_path(self, item, path, included, data_ids,
+                       relationships=None):
+        attr_name = path[0]
 
-        for rel in relationships.values():
-            for item in itertools.chain.from_iterable(rel.values()):
-                if item.id_ not in included:
-                    included[item.id_] = self.__serialize_item(item=item)
-                    self.__include_items(item=item, included=included,
-                                         data_ids=data_ids)
+        fields = self.__return_fields.get(item.type_)
+        if fields and attr_name not in fields:
+            return
 
-        return list(included.values())
+        attr = getattr(item, attr_name, None)
 
-    def __include_items(self, item, included, data_ids):
-        for attr_name in set(item.available_relationships.keys()):
-            if self.__return_fields and \
-                    (item.type_ not in self.__return_fields or
-                     attr_name not in self.__return_fields[item.type_]):
-                continue
+        # Dynamic relationships are loaded beforehand
+        if isinstance(attr, Query):
+            attr = dict_value(dict_=relationships or {},
+                              path=f'{item.id_}.{attr_name}')
 
-            attr: BaseModel = getattr(item, attr_name, None)
-            if (not attr or
-                    isinstance(attr, Query) or
-                    attr.id_ in included or
-                    attr.id_ in data_ids):
-                continue
+        if not attr:
+            return
+
+        attr_items: list[BaseModel] = attr if isinstance(attr, list) \
+            else [attr]
+
+        for attr_item in attr_items:
+            if attr_item.id_ not in included and \
+                    attr_item.id_ not in data_ids and \
+                    attr_item.type_ in RESOURCE_SERIALIZERS:
+                included[attr_item.id_] = attr_item
 
-            serialized_item = self.__serialize_item(item=attr)
-            if serialized_item:
-                included[attr.id_] = serialized_item
-            self.__include_items(item=attr, included=included,
-                                 data_ids=data_ids)
+            if len(path) > 1:
+                self.__include_path(item=attr_item, path=path[1:],
+                                    included=included, data_ids=data_ids)
@@ -1,3 +1,4 @@
+from mvapi.settings import settings
 from mvapi.web.libs.jsonwebtoken import JSONWebToken
 from mvapi.web.models.session import Session
 from mvapi.web.serializers.base import BaseSerializer
@@ -7,14 +8,24 @@ class SessionSerializer(BaseSerializer):
     resource_type = 'session'
     item: Session = None
 
+    @property
+    def cache_attributes(self):
+        # Stateless access tokens are issued anew on every render
+        return not settings.JWTAUTH_SETTINGS.get('STATELESS', False)
+
     def render_attributes(self):
         attrs = super(SessionSerializer, self).render_attributes()
         attrs['remote_ip'] = self.item.remote_ip
         attrs['user_agent'] = self.item.user_agent
+        attrs['last_seen'] = self.item.last_seen
 
         jwt = JSONWebToken(expires_from=self.item.created_date)
         attrs['access_token'] = jwt.get_token(session=self.item)
         attrs['token_type'] = jwt.token_type
-        attrs['expires'] = jwt.expires
+        attrs['expires'] = jwt.access_expires
+
+        if jwt.stateless:
+            attrs['refresh_token'] = jwt.get_refresh_token(session=self.item)
+            attrs['refresh_expires'] = jwt.expires
 
         return attrs
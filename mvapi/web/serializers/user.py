@@ -4,8 +4,16 @@ from mvapi.web.serializers.base import BaseSerializer
 
 class UserSerializer(BaseSerializer):
     resource_type = 'user'
+    cache_attributes = True
     item: User = None
 
+    def get_audience(self):
+        if self.current_user and not self.current_user.is_admin and \
+                self.item.id_ == self.current_user.id_:
+            return 'owner'
+
+        return super(UserSerializer, self).get_audience()
+
     def render_attributes(self):
         attrs = super(UserSerializer, self).render_attributes()
 
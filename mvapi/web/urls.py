@@ -1,10 +1,16 @@
 from flask import Blueprint
 
 from mvapi.web.views.api import APIView
+from mvapi.web.views.operations import OperationsView
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 view_func = APIView.as_view('api_view')
 
+api_bp.add_url_rule(
+    'operations',
+    view_func=OperationsView.as_view('operations_view')
+)
+
 api_bp.add_url_rule(
     '',
     view_func=view_func
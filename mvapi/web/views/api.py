@@ -1,15 +1,22 @@
+import hashlib
 import json
 from collections import defaultdict, OrderedDict
+from datetime import timezone
 
-from flask import g, request
+from flask import g, request, Response, stream_with_context
 from flask.views import View
-from sqlalchemy import literal_column, text, union_all
-from sqlalchemy.orm import Query
+from sqlalchemy import func, inspect
+from sqlalchemy.orm import aliased
+from werkzeug.http import http_date
 
 from mvapi.libs.database import db
 from mvapi.libs.exceptions import NotFoundError
-from mvapi.web.libs.misc import ApiResponse, dict_value, is_local_dev_host, \
-    JSONEncoder
+from mvapi.models import BaseModel
+from mvapi.web.libs.export import get_export_writer
+from mvapi.web.libs.jsonbackend import dumps
+from mvapi.web.libs.misc import ApiResponse, dict_value, IncludedItems, \
+    is_local_dev_host, StreamedItems
+from mvapi.web.serializers import get_fieldsets_columns
 from mvapi.web.serializers.items import ItemsSerializer
 from mvapi.web.views import RESOURCE_VIEWS
 
@@ -34,19 +41,37 @@ class APIView(View):
             if not view_cls:
                 raise NotFoundError
 
+            # Only collections are exported, a resource or its relationships
+            # are rendered as JSON
+            export_writer = None
+            if req_method == 'get' and not kwargs.get('resource_id'):
+                export_writer = get_export_writer(request.accept_mimetypes)
+
+            if export_writer:
+                view = view_cls(current_user=self.__current_user,
+                                export_format=export_writer.mimetype,
+                                **kwargs)
+                return self.__export(view.process_request(), export_writer)
+
             view = view_cls(current_user=self.__current_user, **kwargs)
             resp = view.process_request()
             if req_method == 'post':
                 resp.status = 201
 
         is_delete = req_method == 'delete'
-        results = self.__render(resp, is_delete=is_delete)
+        results = self.__render(resp, is_delete=is_delete,
+                                conditional=req_method in ('get', 'head'))
 
-        db.session.commit()
+        if not db.read_only:
+            db.session.commit()
 
         return results
 
-    def __render(self, response: ApiResponse, is_delete=False):
+    def __render(self, response: ApiResponse, is_delete=False,
+                 conditional=False):
+        if isinstance(response.data, StreamedItems):
+            return self.__stream(response)
+
         results = OrderedDict([
             ('links', self.__generate_response_links(response)),
         ])
@@ -57,15 +82,92 @@ class APIView(View):
         if is_delete:
             return self.__make_response(results=results, response=response)
 
-        relationships = self.__get_relationships(items=response.data)
+        relationships = self.__get_relationships(response)
         serializer = ItemsSerializer(response, relationships=relationships,
                                      current_user=self.__current_user)
 
+        # The document isn't rendered if the client has it already
+        if conditional and self.__set_validators(
+                response=response, relationships=relationships,
+                included=serializer.included_items()):
+            return '', 304, self.__headers
+
         for key, value in serializer.render().items():
             results[key] = value
 
         return self.__make_response(results=results, response=response)
 
+    def __stream(self, response: ApiResponse):
+        # The links depend on the number of items, they are rendered after the
+        # data
+        items: StreamedItems = response.data
+
+        def generate():
+            yield b'{"data":['
+
+            # Streamed responses don't include resources, the batches are
+            # rendered independently
+            for batch in items.batches():
+                serializer = ItemsSerializer(
+                    response,
+                    current_user=self.__current_user,
+                    items=batch
+                )
+                rendered = serializer.render()
+
+                separator = b',' if len(items) > len(batch) else b''
+                yield separator + dumps(rendered['data'])[1:-1]
+
+            if items.pagination and response.limit and \
+                    len(items) == response.limit:
+                response.cursor = items.pagination.encode(items.last)
+
+            results = OrderedDict([
+                ('links', self.__generate_response_links(response)),
+            ])
+
+            if response.meta:
+                results['meta'] = response.meta
+
+            yield b'],' + dumps(results)[1:]
+
+        self.__add_header('Content-Type', 'application/json; charset=utf-8')
+        return Response(stream_with_context(generate()),
+                        status=response.status, headers=self.__headers)
+
+    def __export(self, response: ApiResponse, writer):
+        items = response.data
+        if isinstance(items, StreamedItems):
+            batches = items.batches()
+
+            # A page is fetched before it's written to link the next one
+            if response.limit:
+                batches = list(batches)
+                if items.pagination and len(items) == response.limit:
+                    response.cursor = items.pagination.encode(items.last)
+        else:
+            batches = [items if type(items) is list else [items]] \
+                if items else []
+
+        if response.limit:
+            links = self.__generate_response_links(response)
+            links.pop('self')
+            if links:
+                self.__add_header('Link', ', '.join(
+                    f'<{url}>; rel="{rel}"' for rel, url in links.items()
+                ))
+
+        def generate():
+            for batch in batches:
+                serializer = ItemsSerializer(response,
+                                             current_user=self.__current_user,
+                                             items=batch)
+                yield writer.write(serializer.render_rows())
+
+        self.__add_header('Content-Type', f'{writer.mimetype}; charset=utf-8')
+        return Response(stream_with_context(generate()),
+                        status=response.status, headers=self.__headers)
+
     def __generate_response_links(self, response):
         q_params = request.args.copy()
 
@@ -82,10 +184,11 @@ class APIView(View):
                 links['prev'] = self.__build_url(q_params)
 
             if response.next_page:
-                q_params['page[number]'] = str(response.next_page)
-
                 if response.cursor:
+                    q_params.pop('page[number]', None)
                     q_params['page[cursor]'] = response.cursor
+                else:
+                    q_params['page[number]'] = str(response.next_page)
 
                 links['next'] = self.__build_url(q_params)
 
@@ -113,59 +216,144 @@ class APIView(View):
             if location:
                 self.__add_header('Location', location)
 
-        return (json.dumps(results, cls=JSONEncoder), response.status,
-                self.__headers)
+        return dumps(results), response.status, self.__headers
+
+    def __set_validators(self, response, relationships, included):
+        # Returns True if the client's copy is not modified
+        data = response.data
+        items = (data if type(data) is list else [data]) + included
+
+        if not all(isinstance(item, BaseModel) for item in items):
+            return False
+
+        current_user_id = self.__current_user.id_ \
+            if self.__current_user else ''
+
+        digest = hashlib.blake2b(digest_size=16)
+        for value in (request.host, request.query_string.decode(),
+                      current_user_id,
+                      json.dumps(response.meta, default=str, sort_keys=True)):
+            digest.update(f'{value}\n'.encode())
+
+        for item in items:
+            dates = ','.join(date.isoformat() if date else ''
+                             for date in item.change_dates)
+            digest.update(f'{item.type_}:{item.id_}:{dates}\n'.encode())
+
+        for item_id, item_relationships in sorted(relationships.items()):
+            for key, rel_items in sorted(item_relationships.items()):
+                digest.update(f'{item_id}.{key}:{rel_items.count}\n'.encode())
+
+        etag = digest.hexdigest()
+        self.__add_header('ETag', f'W/"{etag}"')
+
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(etag)
+
+        # Deleted resources don't change the dates of a collection, it's
+        # only validated by ETag
+        if type(data) is list or not data:
+            return False
+
+        last_modified = max(date for item in items
+                            for date in item.change_dates if date) \
+            .replace(tzinfo=timezone.utc, microsecond=0)
+        self.__add_header('Last-Modified', http_date(last_modified))
+
+        if_modified_since = request.if_modified_since
+        return bool(if_modified_since and
+                    last_modified <= if_modified_since)
 
     def __add_header(self, header, value):
         if self.__headers is None:
             self.__headers = {}
         self.__headers[header] = value
 
-    # noinspection PyMethodMayBeStatic
-    def __get_relationships(self, items):
-        rel_queries = defaultdict(list)
+    def __get_relationships(self, response):
         results = {}
 
+        items = response.data
         if not items:
             return results
 
-        include = request.args.get('include', '')
-        if include:
-            include = {i.strip() for i in include.split(',')}
+        include = defaultdict(set)
+        for path in response.include or ():
+            attr_name, _, nested_path = path.partition('.')
+            include[attr_name].add(nested_path)
 
         if type(items) is not list:
             items = [items]
 
+        parent_ids = defaultdict(set)
         for item in items:
             results[str(item.id_)] = {}
 
-            if not include:
-                continue
-
-            attr_names = set(item.available_relationships.keys())
-            for attr_name in sorted(attr_names, key=lambda k: k.lower()):
-                if attr_name not in include:
-                    continue
-
-                attr = getattr(item, attr_name, None)
-                if not isinstance(attr, Query):
-                    continue
-
-                results[str(item.id_)][attr_name] = []
-
-                attr = attr.add_column(
-                    literal_column(f"'{item.id_}__{attr_name}'")
-                    .label('relationship_for')
-                )
-
-                model = attr.column_descriptions[0]['type']
-                rel_queries[model].append(attr.subquery().select())
-
-        for model, queries in rel_queries.items():
-            query = (db.session.query(model, text('relationship_for'))
-                     .select_entity_from(union_all(*queries)))
-            for rel_items, key in query.all():
-                chunks = key.split('__')
-                results[chunks[0]][chunks[1]].append(rel_items)
+            attr_names = include.keys() & item.schema.dynamic_relationships
+            for attr_name in attr_names:
+                results[str(item.id_)][attr_name] = IncludedItems()
+                parent_ids[(item.__class__, attr_name)].add(item.id_)
+
+        columns = get_fieldsets_columns(response.return_fields)
+        limits = response.include_limits or {}
+
+        for (model, attr_name), ids in parent_ids.items():
+            query = self.__get_relationship_query(
+                model=model,
+                attr_name=attr_name,
+                ids=ids,
+                limit=limits.get(attr_name),
+                include=include[attr_name] - {''},
+                columns=columns
+            )
+
+            for rel_item, parent_id, count in query.all():
+                rel_items = results[str(parent_id)][attr_name]
+                rel_items.append(rel_item)
+                rel_items.count = count
 
         return results
+
+    @staticmethod
+    def __get_relationship_query(model, attr_name, ids, limit, include,
+                                 columns):
+        # The related items are numbered within every parent to select the
+        # first page of each
+        prop = inspect(model).relationships[attr_name]
+        rel_model = prop.mapper.class_
+        parent = aliased(model)
+
+        order_by = prop.order_by or rel_model.get_sort_fields()
+        if not isinstance(order_by, (list, tuple)):
+            order_by = [order_by]
+
+        subquery = (
+            db.session.query(
+                rel_model,
+                parent.id_.label('relationship_for'),
+                func.row_number().over(
+                    partition_by=parent.id_,
+                    order_by=[*order_by, rel_model.id_]
+                ).label('relationship_number'),
+                func.count().over(
+                    partition_by=parent.id_
+                ).label('relationship_count')
+            )
+            .select_from(parent)
+            .join(getattr(parent, attr_name))
+            .filter(parent.id_.in_(ids))
+            .subquery()
+        )
+
+        rel_entity = aliased(rel_model, subquery)
+        query = (db.session.query(rel_entity, subquery.c.relationship_for,
+                                  subquery.c.relationship_count)
+                 .order_by(subquery.c.relationship_for,
+                           subquery.c.relationship_number)
+                 .options(*rel_model.get_load_options(include=include,
+                                                      columns=columns,
+                                                      entity=rel_entity)))
+
+        if limit:
+            query = query.filter(subquery.c.relationship_number <= limit)
+
+        return query
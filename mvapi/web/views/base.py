@@ -1,4 +1,3 @@
-import json
 import re
 from copy import deepcopy
 
@@ -7,21 +6,36 @@ from sqlalchemy.orm import Query
 from werkzeug.exceptions import BadRequest
 
 from mvapi.libs.exceptions import NotFoundError
+from mvapi.libs.pagination import KeysetPagination
 from mvapi.settings import settings
 from mvapi.web.libs.exceptions import AccessDeniedError, BadRequestError, \
     UnauthorizedError
-from mvapi.web.libs.misc import ApiResponse
+from mvapi.web.libs.jsonbackend import get_request_json, loads
+from mvapi.web.libs.misc import ApiResponse, StreamedItems
 from mvapi.web.models.user import User
+from mvapi.web.serializers import get_fieldsets_columns
 
 
 class BaseView:
     resource_type = None
     resource_model = None
+    cursor_pagination = False
+    # Collections are rendered while they are fetched from the database
+    stream_response = False
+    # To-many relationship items without a get_<name>_relationship method
+    # are selected by their ids, any items can be linked then, the method
+    # has to be defined to check which items the current user can link
+    select_relationships = False
+    default_include: set = None
 
     current_user: User = None
+    method = None
+    args = None
+    json_data = None
     resource_id = None
     relationship_type = None
     related_relationship_type = None
+    export_format = None
     resource = None
     request_attrs = None
     request_relationships = None
@@ -31,6 +45,8 @@ class BaseView:
     cursor = None
     common_args = None
     return_fields = None
+    include: set = None
+    include_limits: dict = None
 
     def __init__(self, **kwargs):
         self.current_user = g.current_user
@@ -39,7 +55,21 @@ class BaseView:
         self.relationship_type = kwargs.get('relationship_type')
         self.related_relationship_type = kwargs.get('related_relationship_type')
 
+        # The request method, query args and JSON data can be passed
+        # explicitly to process a request which isn't the current one, e.g. an
+        # atomic operation
+        self.method = kwargs.get('method') or request.method.lower()
+        self.args = kwargs.get('args', request.args)
+        self.json_data = kwargs.get('json_data')
+
+        # Exported collections are flat rows of the resources' attributes,
+        # admins export all of them unless they set the page size
+        self.export_format = kwargs.get('export_format')
+
         self.limit = settings.LIMIT
+        if self.export_format and self.current_user and \
+                self.current_user.is_admin:
+            self.limit = 0
 
     def __get_offset(self):
         return self.limit * (self.current_page - 1) if self.limit else 0
@@ -50,10 +80,16 @@ class BaseView:
             'offset': self.__get_offset()
         }
 
-        for key, value in request.args.items():
+        if self.cursor_pagination:
+            self.common_args['cursor'] = ''
+
+        for key, value in self.args.items():
             key = key.lower()
 
-            if key in ('include',):
+            match = re.match(r'page\[include\.([a-zA-Z0-9_]+)]\[size]', key)
+            if match:
+                self.process_include_page_arg(relationship=match.group(1),
+                                              value=value)
                 continue
 
             match = re.match(r'page\[([a-zA-Z0-9]+)]', key)
@@ -78,15 +114,41 @@ class BaseView:
 
             raise BadRequestError
 
+        if self.include is None and self.default_include:
+            self.include = set(self.default_include)
+
+        if self.export_format:
+            self.include = None
+
+        if (self.include or self.return_fields) and self.resource_model:
+            model = self.__get_primary_model()
+            self.common_args['options'] = model.get_load_options(
+                include=self.include,
+                columns=get_fieldsets_columns(self.return_fields)
+            )
+
+    def __get_primary_model(self):
+        model = self.resource_model
+
+        if self.related_relationship_type:
+            attr = getattr(model, self.related_relationship_type, None)
+            if attr is None:
+                raise NotFoundError
+            model = attr.property.mapper.entity
+
+        return model
+
     def __process_json_data(self):
         self.request_attrs = {}
         self.request_relationships = {}
 
-        if 'multipart/form-data' in request.headers.get('Content-Type'):
-            json_data = json.loads(request.values.get('json', {}))
+        if self.json_data is not None:
+            json_data = self.json_data
+        elif 'multipart/form-data' in (request.content_type or ''):
+            json_data = loads(request.values.get('json', {}))
         else:
             try:
-                json_data = request.json or {}
+                json_data = get_request_json() or {}
             except BadRequest:
                 return
 
@@ -109,6 +171,7 @@ class BaseView:
             self.__check_nullables()
 
     def __process_relationship(self, relationship, data):
+        rel_attr = None
         if self.resource_model:
             rel_attr = getattr(self.resource_model, relationship, None)
             if (not rel_attr or
@@ -116,6 +179,11 @@ class BaseView:
                 raise BadRequestError
 
         func = getattr(self, f'get_{relationship}_relationship', None)
+
+        if not func and rel_attr and type(data) is list and \
+                self.select_relationships:
+            func = rel_attr.property.mapper.class_.query.get_many
+
         if not func:
             raise NotImplementedError
 
@@ -123,12 +191,14 @@ class BaseView:
             results = data
 
         elif type(data) is list:
+            ids = list(dict.fromkeys(item['id'] for item in data))
+
             try:
-                results = func([item['id'] for item in data])
+                results = func(ids)
             except NotFoundError:
                 raise BadRequestError
 
-            if len(results) != len(data):
+            if len(results) != len(ids):
                 raise BadRequestError
 
             if type(results) is not list:
@@ -149,8 +219,9 @@ class BaseView:
         self.request_relationships[relationship] = results
 
     def __check_nullables(self):
-        for key in (self.resource_model.required_keys &
-                    set(self.request_attrs.keys())):
+        required_keys = self.resource_model.schema.required_keys
+
+        for key in required_keys & self.request_attrs.keys():
             value = self.request_attrs[key]
 
             if type(value) is bool and value is False:
@@ -161,8 +232,7 @@ class BaseView:
                     f'Attribute {key} can\'t be null or empty'
                 )
 
-        for key in (self.resource_model.required_keys &
-                    set(self.request_relationships.keys())):
+        for key in required_keys & self.request_relationships.keys():
             if not self.request_relationships[key]:
                 raise BadRequestError(
                     f'Relationship {key} can\'t be null or empty'
@@ -177,7 +247,14 @@ class BaseView:
             data = self.resource
 
         if isinstance(data, Query):
-            data = data.all()
+            if self.__is_streamed():
+                data = self.__get_streamed_items(data)
+
+            else:
+                data = data.all()
+
+                if self.common_args.get('cursor') is not None:
+                    self.cursor = self.__get_next_cursor(data)
 
         return ApiResponse(
             data=data,
@@ -188,11 +265,49 @@ class BaseView:
             cursor=self.cursor,
             relationship_type=self.relationship_type,
             related_relationship_type=self.related_relationship_type,
-            return_fields=self.return_fields
+            return_fields=self.return_fields,
+            include=self.include,
+            include_limits=self.include_limits
         )
 
+    def __is_streamed(self):
+        if self.method != 'get':
+            return False
+
+        # Included resources are deduplicated over the whole document, they
+        # aren't streamed
+        if self.stream_response or self.export_format:
+            if self.include:
+                raise BadRequestError('Resources can\'t be included in a '
+                                      'streamed response')
+            return True
+
+        threshold = settings.STREAM_THRESHOLD
+        return bool(threshold and not self.include and
+                    (not self.limit or self.limit > threshold))
+
+    def __get_streamed_items(self, query):
+        pagination = None
+        if self.common_args.get('cursor') is not None:
+            pagination = KeysetPagination(
+                query.column_descriptions[0]['entity'],
+                sort=self.common_args.get('sort')
+            )
+
+        return StreamedItems(query, batch_size=settings.STREAM_BATCH_SIZE,
+                             pagination=pagination)
+
+    def __get_next_cursor(self, items):
+        if not self.limit or len(items) != self.limit:
+            return None
+
+        item = items[-1]
+        pagination = KeysetPagination(item.__class__,
+                                      sort=self.common_args.get('sort'))
+        return pagination.encode(item)
+
     def process_request(self):
-        req_method = request.method.lower()
+        req_method = self.method
         self.__process_request_args()
 
         if (req_method == 'post' and self.resource_id and
@@ -260,8 +375,8 @@ class BaseView:
 
         attr_keys, rel_keys = set(), set()
         if self.resource_model:
-            attr_keys = self.resource_model.available_columns
-            rel_keys = self.resource_model.relationship_keys
+            attr_keys = self.resource_model.schema.columns
+            rel_keys = self.resource_model.schema.relationship_keys
 
         attr_keys |= include or set()
         attr_keys |= required or set()
@@ -282,7 +397,7 @@ class BaseView:
             errors = []
             for key in required:
                 val = data.get(key)
-                if not val and key in self.resource_model.available_columns:
+                if not val and key in self.resource_model.schema.columns:
                     column_name = self.resource_model.readable_column_name(key)
                     errors.append(f'{column_name} is required')
 
@@ -333,7 +448,13 @@ class BaseView:
             return self.resource
 
         if self.resource_model and self.resource_id:
-            return self.resource_model.query.get(self.resource_id)
+            query = self.resource_model.query
+
+            options = (self.common_args or {}).get('options')
+            if options and not self.related_relationship_type:
+                query = query.options(*options)
+
+            return query.get(self.resource_id)
 
         raise NotFoundError
 
@@ -351,14 +472,13 @@ class BaseView:
             raise AccessDeniedError
 
     def process_sort_arg(self, value):
-        model = self.resource_model
-
-        if self.related_relationship_type:
-            attr = getattr(model, self.related_relationship_type, None)
-            model = attr.property.mapper.entity
-
+        model = self.__get_primary_model()
         self.common_args['sort'] = model.get_sort_fields(value)
 
+    def process_include_arg(self, value):
+        self.include = {path.strip() for path in value.split(',')
+                        if path.strip()}
+
     def process_page_arg(self, page, value):
         page = page.lower()
 
@@ -369,8 +489,17 @@ class BaseView:
         if page == 'number':
             self.current_page = int(value)
 
+        if page == 'cursor':
+            self.common_args['cursor'] = value
+
         self.common_args['offset'] = self.__get_offset()
 
+    def process_include_page_arg(self, relationship, value):
+        if self.include_limits is None:
+            self.include_limits = {}
+
+        self.include_limits[relationship] = int(value)
+
     def process_filter_arg(self, filter_, value):
         filter_ = filter_.lower()
         method = getattr(self, f'get_{filter_}_filter', None)
@@ -0,0 +1,156 @@
+from flask import g
+from flask.views import View
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import BadRequest
+
+from mvapi.libs.database import db
+from mvapi.libs.exceptions import AppException, NotFoundError
+from mvapi.web.libs.exceptions import BadRequestError
+from mvapi.web.libs.jsonbackend import dumps, get_request_json
+from mvapi.web.serializers.items import ItemsSerializer
+from mvapi.web.views import RESOURCE_VIEWS
+
+ATOMIC_EXTENSION = 'https://jsonapi.org/ext/atomic'
+
+OPERATION_METHODS = {
+    'add': 'post',
+    'update': 'patch',
+    'remove': 'delete',
+}
+
+
+# The operations are processed in one transaction, resources added by the
+# previous ones can be referenced by their lid
+class OperationsView(View):
+    methods = ['post']
+
+    __current_user = None
+    __views = None
+    __local_ids = None
+
+    def dispatch_request(self):
+        self.__current_user = g.current_user
+        self.__local_ids = {}
+        self.__views = {}
+
+        for view_cls in RESOURCE_VIEWS.values():
+            self.__views[view_cls.resource_type] = view_cls
+            if view_cls.resource_model:
+                self.__views[view_cls.resource_model.__tablename__] = view_cls
+
+        try:
+            json_data = get_request_json() or {}
+        except BadRequest:
+            raise BadRequestError
+
+        operations = None
+        if isinstance(json_data, dict):
+            operations = json_data.get('atomic:operations')
+
+        if not operations or type(operations) is not list:
+            raise BadRequestError('Atomic operations are required')
+
+        results = []
+        for idx, operation in enumerate(operations):
+            try:
+                results.append(self.__process_operation(operation))
+            except AppException as exc:
+                # The error keeps its text and status and points to the
+                # operation that failed
+                exc.source = {'pointer': f'/atomic:operations/{idx}'}
+                raise
+
+        db.session.commit()
+
+        return dumps({'atomic:results': results}), 200, {
+            'Content-Type': f'application/vnd.api+json; '
+                            f'ext="{ATOMIC_EXTENSION}"'
+        }
+
+    def __process_operation(self, operation):
+        if type(operation) is not dict:
+            raise BadRequestError
+
+        method = OPERATION_METHODS.get(operation.get('op'))
+        if not method:
+            raise BadRequestError(f'Operation {operation.get("op")} is not '
+                                  f'supported')
+
+        ref = operation.get('ref')
+        data = operation.get('data')
+        relationship = None
+
+        if ref:
+            view_cls = self.__get_view_cls(ref.get('type'))
+            resource_id = self.__get_id(view_cls, ref)
+            relationship = ref.get('relationship')
+
+        elif type(data) is dict:
+            view_cls = self.__get_view_cls(data.get('type'))
+            resource_id = None if method == 'post' \
+                else self.__get_id(view_cls, data)
+
+        else:
+            raise BadRequestError('Operation target is not specified')
+
+        if relationship:
+            data = self.__resolve_linkage(data)
+
+        elif type(data) is dict:
+            data = dict(data)
+            data['relationships'] = {
+                key: dict(value, data=self.__resolve_linkage(value.get('data')))
+                for key, value in (data.get('relationships') or {}).items()
+            }
+
+        view = view_cls(current_user=self.__current_user,
+                        resource_id=resource_id,
+                        relationship_type=relationship,
+                        method=method,
+                        args=MultiDict(),
+                        json_data={'data': data} if data is not None else {})
+        response = view.process_request()
+
+        if method == 'post' and not relationship:
+            lid = data.get('lid')
+            if lid and response.data:
+                self.__local_ids[(view_cls, lid)] = response.data.id_
+
+        result = {}
+
+        if method != 'delete' and not relationship and response.data:
+            serializer = ItemsSerializer(response,
+                                         current_user=self.__current_user)
+            result['data'] = serializer.render()['data']
+
+        if response.meta:
+            result['meta'] = response.meta
+
+        return result
+
+    def __get_view_cls(self, type_):
+        view_cls = self.__views.get(type_)
+        if not view_cls:
+            raise NotFoundError(f'Resource type {type_} is not found')
+
+        return view_cls
+
+    def __get_id(self, view_cls, identifier):
+        if identifier.get('id'):
+            return identifier['id']
+
+        lid = identifier.get('lid')
+        if (view_cls, lid) not in self.__local_ids:
+            raise BadRequestError(f'Local id {lid} is not defined')
+
+        return self.__local_ids[(view_cls, lid)]
+
+    def __resolve_linkage(self, linkage):
+        if type(linkage) is list:
+            return [self.__resolve_linkage(item) for item in linkage]
+
+        if type(linkage) is not dict or linkage.get('id'):
+            return linkage
+
+        view_cls = self.__get_view_cls(linkage.get('type'))
+        return dict(linkage, id=self.__get_id(view_cls, linkage))
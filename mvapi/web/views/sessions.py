@@ -2,7 +2,10 @@ from flask import request
 
 from mvapi.libs.exceptions import NotFoundError
 from mvapi.web.libs.decorators import auth_required
-from mvapi.web.libs.exceptions import BadRequestError, UnauthorizedError
+from mvapi.web.libs.exceptions import BadRequestError, JWTError, \
+    UnauthorizedError
+from mvapi.web.libs.jsonwebtoken import JSONWebToken
+from mvapi.web.libs.passwords import password_hasher
 from mvapi.web.models.session import Session
 from mvapi.web.models.user import User
 from mvapi.web.views.base import BaseView
@@ -14,11 +17,22 @@ class SessionsView(BaseView):
 
     @auth_required
     def get(self):
-        return (self.current_user.sessions.get(self.resource_id)
-                if self.resource_id
-                else self.current_user.sessions.apply_args(**self.common_args))
+        sessions = self.current_user.sessions.filter(
+            Session.revoked_date.is_(None)
+        )
+
+        return (sessions.get(self.resource_id) if self.resource_id
+                else sessions.apply_args(**self.common_args))
 
     def post(self):
+        # New access tokens of a session are issued for its refresh token
+        refresh_token = self.request_attrs.get('refresh_token')
+        if refresh_token:
+            try:
+                return JSONWebToken().get_session(refresh_token)
+            except JWTError as exc:
+                raise UnauthorizedError(*exc.args)
+
         data = self.available_data(required={'email'}, extra={'password'})
         password = data.get('password')
 
@@ -31,11 +45,25 @@ class SessionsView(BaseView):
         except NotFoundError:
             raise UnauthorizedError('Email address not found')
 
-        if password and not user.passwords_matched(password=password):
-            raise UnauthorizedError('Password is wrong')
+        if password:
+            if not user.passwords_matched(password=password):
+                raise UnauthorizedError('Password is wrong')
+
+            # The password is hashed again when the cost is changed
+            if password_hasher.needs_rehash(user.password):
+                user.password = password
 
         return Session.create(
             user=user,
             remote_ip=request.remote_addr,
             user_agent=request.user_agent.string
         )
+
+    @auth_required
+    def delete(self):
+        if not self.resource_id:
+            raise NotFoundError
+
+        session = self.current_user.sessions.get(self.resource_id)
+        if not session.revoked_date:
+            session.revoke()
@@ -40,5 +40,9 @@ setup(
         'validate-email == 1.3',
         'werkzeug == 2.1.0',
     ],
+    extras_require={
+        'orjson': ['orjson >= 3.6'],
+        'ujson': ['ujson >= 5.4'],
+    },
     python_requires='>=3.9',
 )
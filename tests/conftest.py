@@ -0,0 +1,99 @@
+import os
+
+import pytest
+from sqlalchemy import event
+
+os.environ.setdefault('SETTINGS', 'sampleapp.settings.Settings')
+
+from mvapi.libs.database import db  # noqa: E402
+from mvapi.libs.run import run_app  # noqa: E402
+from mvapi.models import BaseModel  # noqa: E402
+from mvapi.settings import settings  # noqa: E402
+from mvapi.web.libs.rendercache import render_cache  # noqa: E402
+from mvapi.web.libs.revocation import revocation_list  # noqa: E402
+from mvapi.web.libs.sessioncache import session_cache  # noqa: E402
+from mvapi.web.models.user import User  # noqa: E402
+
+
+def clear_caches():
+    render_cache.clear()
+    revocation_list.clear()
+    session_cache.clear()
+
+
+@pytest.fixture(scope='session')
+def app():
+    return run_app(cli_=None)
+
+
+@pytest.fixture
+def database(app):
+    engine = db.session.get_bind()
+    BaseModel.metadata.drop_all(engine)
+    BaseModel.metadata.create_all(engine)
+    clear_caches()
+
+    with app.app_context():
+        yield db
+
+    db.session.remove()
+    clear_caches()
+
+
+@pytest.fixture
+def client(app, database):
+    return app.test_client()
+
+
+@pytest.fixture
+def users(database):
+    admin = User.create(email='admin@example.com', password='secret',
+                        is_admin=True)
+    user = User.create(email='user@example.com', password='secret',
+                       is_admin=False)
+    db.session.commit()
+
+    return {'admin': admin.id_, 'user': user.id_}
+
+
+@pytest.fixture
+def login(client, users):
+    def login_(email='user@example.com'):
+        # A request gets a new database session, the app context of the
+        # tests keeps the one of the previous request
+        db.session.remove()
+        response = client.post('/api/sessions', json={'data': {
+            'attributes': {'email': email, 'password': 'secret'}
+        }})
+        assert response.status_code == 201
+
+        token = response.json['data']['attributes']['access_token']
+        return {'Authorization': f'Bearer {token}'}
+
+    return login_
+
+
+@pytest.fixture
+def statements(database):
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    engine = db.session.get_bind()
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def override_settings(monkeypatch):
+    def override(**values):
+        for name, value in values.items():
+            monkeypatch.setenv(name, str(value))
+        settings.reload()
+
+    yield override
+
+    monkeypatch.undo()
+    settings.reload()
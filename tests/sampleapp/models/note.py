@@ -0,0 +1,19 @@
+from sqlalchemy import Boolean, Column, ForeignKey, String, Text
+from sqlalchemy.orm import relationship
+
+from mvapi.models import BaseModel, BaseQuery
+
+
+class Note(BaseModel):
+    title = Column(String(128), nullable=False)
+    body = Column(Text)
+    is_public = Column(Boolean, default=False)
+    user_id = Column(String, ForeignKey('user.id', ondelete='CASCADE'),
+                     index=True, nullable=False)
+    parent_id = Column(String, ForeignKey('note.id', ondelete='CASCADE'),
+                       index=True)
+
+    user = relationship('User', uselist=False)
+    parent = relationship('Note', uselist=False, remote_side='Note.id_')
+    children = relationship('Note', lazy='dynamic', viewonly=True,
+                            query_class=BaseQuery)
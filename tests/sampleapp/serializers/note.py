@@ -0,0 +1,19 @@
+from mvapi.web.serializers.base import BaseSerializer
+
+
+class NoteSerializer(BaseSerializer):
+    resource_type = 'note'
+
+    def render_attributes(self):
+        attrs = super().render_attributes()
+        attrs['title'] = self.item.title
+        attrs['is_public'] = self.item.is_public
+        attrs['headline'] = self.get_headline()
+        attrs['summary'] = self.get_summary()
+        return attrs
+
+    def get_headline(self):
+        return self.item.title.upper()
+
+    def get_summary(self):
+        return self.item.body[:10] if self.item.body else None
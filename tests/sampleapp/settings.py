@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+from mvapi.settings.default_settings import DefaultSettings
+
+
+class Settings(DefaultSettings):
+    DB_URI = 'sqlite:///' + os.path.join(tempfile.gettempdir(),
+                                         'mvapi-tests.sqlite')
+    ERRORS_PATH = os.path.join(tempfile.gettempdir(), 'mvapi-errors')
+    JWTAUTH_SETTINGS = {}
+    MODELS = ['sampleapp.models.note']
+    PASSWORD_HASH_FAST = True
+    SECRET_KEY = 'secret'
+    SERIALIZERS = ['sampleapp.serializers.note']
+    VIEWS = ['sampleapp.views.notes']
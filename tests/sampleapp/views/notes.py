@@ -0,0 +1,41 @@
+from mvapi.web.libs.decorators import auth_required
+from mvapi.web.models.user import User
+from mvapi.web.views.base import BaseView
+from sampleapp.models.note import Note
+
+
+class NotesView(BaseView):
+    resource_type = 'notes'
+    resource_model = Note
+
+    @auth_required
+    def get(self):
+        if self.resource_id:
+            return self.get_resource()
+        return Note.query.apply_args(**self.common_args)
+
+    @auth_required
+    def post(self):
+        data = {**self.request_attrs, **self.request_relationships}
+        data.setdefault('user', self.current_user)
+        return Note.create(**data)
+
+    @auth_required
+    def patch(self):
+        data = {**self.request_attrs, **self.request_relationships}
+        for key, value in data.items():
+            setattr(self.resource, key, value)
+        return self.resource
+
+    @auth_required
+    def delete(self):
+        self.resource.delete()
+
+    def get_user_relationship(self, id_):
+        return User.query.get(id_)
+
+    def get_parent_relationship(self, id_):
+        return Note.query.get(id_)
+
+    def get_title_filter(self, value):
+        return [Note.title == value]
@@ -0,0 +1,59 @@
+import pytest
+
+from mvapi.libs.exceptions import ModelKeyError
+from mvapi.web.models.user import User
+from sampleapp.models.note import Note
+
+
+def test_bulk_create_returns_ids_in_input_order(database, users):
+    rows = [
+        {'title': 'first', 'user_id': users['user']},
+        {'title': 'second', 'body': 'body', 'user_id': users['user']},
+        {'title': 'third', 'user_id': users['admin']},
+        {'title': 'fourth', 'body': 'body', 'user_id': users['admin']},
+    ]
+
+    ids = Note.bulk_create(rows, chunk_size=3)
+
+    titles = {note.id_: note.title for note in Note.query}
+    assert [titles[id_] for id_ in ids] == [row['title'] for row in rows]
+
+
+def test_bulk_create_returns_objects_in_input_order(database, users):
+    rows = [{'title': f'note {idx}', 'user_id': users['user']}
+            for idx in range(5)]
+    rows[1]['body'] = 'body'
+
+    notes = Note.bulk_create(rows, returning=True)
+
+    assert [note.title for note in notes] == [row['title'] for row in rows]
+    assert all(note.created_date for note in notes)
+
+
+def test_bulk_create_runs_validators(database):
+    User.bulk_create([{'email': 'NEW@example.com', 'password': 'secret',
+                       'is_admin': False}])
+
+    user = User.query.get_by(email='new@example.com')
+    assert user.password != 'secret'
+    assert user.passwords_matched('secret')
+
+
+def test_bulk_create_rejects_unknown_attributes(database, users):
+    with pytest.raises(ModelKeyError):
+        Note.bulk_create([{'title': 'note', 'user_id': users['user'],
+                           'color': 'red'}])
+
+
+def test_bulk_update(database, users):
+    ids = Note.bulk_create([{'title': f'note {idx}', 'user_id': users['user']}
+                            for idx in range(3)])
+    note = Note.query.get(ids[0])
+
+    updated = Note.bulk_update([{'id_': ids[0], 'title': 'changed'},
+                                {'id_': ids[2], 'body': 'body'}])
+
+    assert updated == 2
+    assert note.title == 'changed'
+    assert Note.query.get(ids[2]).body == 'body'
+    assert Note.query.get(ids[1]).title == 'note 1'
@@ -0,0 +1,68 @@
+import pytest
+
+from mvapi.libs.database import db
+from mvapi.web.models.user import User
+from sampleapp.models.note import Note
+
+
+@pytest.fixture
+def note(users):
+    note = Note.create(title='note', user=User.query.get(users['user']))
+    db.session.commit()
+    return note.id_
+
+
+def get(client, url, headers):
+    db.session.remove()
+    return client.get(url, headers=headers)
+
+
+def test_unchanged_collection_is_not_modified(client, login, note):
+    headers = login()
+
+    response = get(client, '/api/notes', headers)
+    etag = response.headers['ETag']
+    assert etag.startswith('W/"')
+
+    response = get(client, '/api/notes', {**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_changed_collection_is_rendered(client, login, note):
+    headers = login()
+    etag = get(client, '/api/notes', headers).headers['ETag']
+
+    db.session.remove()
+    Note.query.get(note).title = 'changed'
+    db.session.commit()
+
+    response = get(client, '/api/notes', {**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_validators_depend_on_the_query_and_user(client, login, note):
+    headers = login()
+    etag = get(client, '/api/notes', headers).headers['ETag']
+
+    assert get(client, '/api/notes?sort=title',
+               headers).headers['ETag'] != etag
+    assert get(client, '/api/notes',
+               login('admin@example.com')).headers['ETag'] != etag
+
+
+def test_resource_is_validated_by_date(client, login, note):
+    headers = login()
+
+    response = get(client, f'/api/notes/{note}', headers)
+    last_modified = response.headers['Last-Modified']
+
+    response = get(client, f'/api/notes/{note}',
+                   {**headers, 'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+
+    response = get(client, f'/api/notes/{note}',
+                   {**headers,
+                    'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'})
+    assert response.status_code == 200
@@ -0,0 +1,78 @@
+import pytest
+
+from mvapi.libs.database import db
+from mvapi.web.models.user import User
+from sampleapp.models.note import Note
+
+
+def create_notes(user_id, count):
+    db.session.remove()
+    user = User.query.get(user_id)
+    parent = Note.create(title='parent', user=user)
+    for idx in range(count):
+        Note.create(title=f'note {idx}', user=user, parent=parent)
+    db.session.commit()
+
+
+def count_statements(client, headers, statements, query_string):
+    db.session.remove()
+    statements.clear()
+
+    response = client.get(f'/api/notes?{query_string}', headers=headers)
+    assert response.status_code == 200
+
+    return len(statements), response.json
+
+
+@pytest.mark.parametrize('include', ['parent', 'user', 'parent.user',
+                                     'parent,user'])
+def test_statements_dont_depend_on_the_rows(client, login, users, statements,
+                                            include):
+    headers = login()
+
+    # The first request caches the session of the access token
+    create_notes(users['user'], 2)
+    count_statements(client, headers, statements, '')
+    few, _ = count_statements(client, headers, statements,
+                              f'include={include}')
+
+    create_notes(users['user'], 8)
+    many, _ = count_statements(client, headers, statements,
+                                      f'include={include}')
+
+    assert few == many
+
+
+def test_included_resources(client, login, users, statements):
+    headers = login()
+    create_notes(users['user'], 2)
+
+    _, document = count_statements(client, headers, statements,
+                                   'include=parent.user'
+                                   '&filter[title]=note 0')
+
+    included = {(item['type'], item['attributes'].get('title'))
+                for item in document['included']}
+    assert included == {('note', 'parent'), ('user', None)}
+
+
+def test_linkage_is_built_from_foreign_keys(client, login, users,
+                                            statements):
+    headers = login()
+    create_notes(users['user'], 2)
+    count_statements(client, headers, statements, '')
+
+    count, document = count_statements(client, headers, statements,
+                                       'filter[title]=note 0')
+
+    relationships = document['data'][0]['relationships']
+    assert relationships['user']['data'] == \
+        {'type': 'user', 'id': users['user']}
+    assert relationships['parent']['data']['type'] == 'note'
+    assert 'included' not in document
+
+    # Neither the user nor the parent note is loaded
+    selects = [statement for statement in statements[-count:]
+               if statement.lstrip().startswith('SELECT')]
+    assert len(selects) == 1
+    assert 'JOIN' not in selects[0]
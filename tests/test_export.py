@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+
+import pytest
+
+from mvapi.libs.database import db
+from mvapi.web.models.user import User
+from sampleapp.models.note import Note
+
+
+@pytest.fixture
+def notes(users):
+    user = User.query.get(users['user'])
+    for idx in range(5):
+        Note.create(title=f'note {idx}', body='a, "quoted" body', user=user)
+    db.session.commit()
+
+
+def export(client, headers, mimetype, query_string=''):
+    response = client.get(f'/api/notes?sort=title{query_string}',
+                          headers={**headers, 'Accept': mimetype})
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith(mimetype)
+    return response
+
+
+def test_ndjson_export(client, login, notes):
+    response = export(client, login(), 'application/x-ndjson')
+
+    rows = [json.loads(line) for line in response.data.splitlines()]
+    assert [row['title'] for row in rows] == \
+        [f'note {idx}' for idx in range(5)]
+    assert set(rows[0]) == {'id', 'created_date', 'title', 'is_public',
+                            'headline', 'summary'}
+
+
+def test_csv_export_with_fields(client, login, notes):
+    response = export(client, login(), 'text/csv',
+                      '&fields[note]=title,summary')
+
+    rows = list(csv.reader(io.StringIO(response.data.decode())))
+    assert rows[0] == ['id', 'title', 'summary']
+    assert rows[1][1:] == ['note 0', 'a, "quoted']
+    assert len(rows) == 6
+
+
+def test_page_size_is_linked(client, login, notes):
+    response = export(client, login(), 'application/x-ndjson',
+                      '&page[size]=2')
+
+    assert len(response.data.splitlines()) == 2
+    assert 'rel="next"' in response.headers['Link']
+
+
+def test_admins_export_everything(client, login, notes, override_settings):
+    override_settings(LIMIT=2)
+
+    response = export(client, login(), 'application/x-ndjson')
+    assert len(response.data.splitlines()) == 2
+
+    response = export(client, login('admin@example.com'),
+                      'application/x-ndjson')
+    assert len(response.data.splitlines()) == 5
+    assert 'Link' not in response.headers
+
+
+def test_resource_is_rendered_as_json(client, login, notes):
+    note_id = Note.query.first().id_
+
+    response = client.get(f'/api/notes/{note_id}', headers={
+        **login(), 'Accept': 'text/csv'
+    })
+
+    assert response.status_code == 200
+    assert response.json['data']['id'] == note_id
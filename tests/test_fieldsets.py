@@ -0,0 +1,63 @@
+from sqlalchemy import inspect
+
+from mvapi.libs.database import db
+from mvapi.web.models.user import User
+from mvapi.web.serializers import get_fieldsets_columns
+from sampleapp.models.note import Note
+
+
+def create_note(users):
+    note = Note.create(title='hello', body='a body longer than ten',
+                       user=User.query.get(users['user']))
+    db.session.commit()
+    return note.id_
+
+
+def test_fieldset_loads_only_columns_the_serializer_reads(database):
+    columns = get_fieldsets_columns({'note': {'title'}})
+
+    assert {'id_', 'title', 'is_public', 'user_id'} <= columns['note']
+    assert 'body' not in columns['note']
+
+
+def test_attribute_rendered_by_helper(client, login, users):
+    note_id = create_note(users)
+
+    response = client.get(f'/api/notes/{note_id}?fields[note]=summary',
+                          headers=login())
+
+    assert response.status_code == 200
+    assert response.json['data']['attributes'] == {'summary': 'a body lon'}
+
+
+def test_helper_reading_a_column_rendered_for_another_key(client, login,
+                                                         users):
+    note_id = create_note(users)
+
+    response = client.get(f'/api/notes/{note_id}?fields[note]=headline',
+                          headers=login())
+
+    assert response.json['data']['attributes'] == {'headline': 'HELLO'}
+
+
+def test_collection_with_fieldset(client, login, users):
+    create_note(users)
+
+    response = client.get('/api/notes?fields[note]=title', headers=login())
+
+    assert response.status_code == 200
+    assert [item['attributes'] for item in response.json['data']] == \
+        [{'title': 'hello'}]
+
+
+def test_deferred_column_is_loaded_when_used(database, users):
+    note_id = create_note(users)
+    db.session.expunge_all()
+
+    options = Note.get_load_options(columns=get_fieldsets_columns(
+        {'note': {'title'}}
+    ))
+    note = Note.query.options(*options).get(note_id)
+
+    assert 'body' in inspect(note).unloaded
+    assert note.body == 'a body longer than ten'
@@ -0,0 +1,64 @@
+import pytest
+
+from mvapi.libs.database import db
+from mvapi.web.models.user import User
+from sampleapp.models.note import Note
+
+
+@pytest.fixture
+def notes(users):
+    user = User.query.get(users['user'])
+    parents = [Note.create(title=f'parent {idx}', user=user)
+               for idx in range(2)]
+
+    for parent in parents:
+        for idx in range(20):
+            Note.create(title=f'child {idx}', user=user, parent=parent)
+
+    db.session.commit()
+    return [parent.id_ for parent in parents]
+
+
+def get_parents(client, headers, query=''):
+    response = client.get(f'/api/notes?filter[title]=parent 0&{query}',
+                          headers=headers)
+    assert response.status_code == 200
+    return response.json
+
+
+def test_includes_all_related_items_by_default(client, login, notes):
+    document = get_parents(client, login(), 'include=children')
+
+    children = document['data'][0]['relationships']['children']
+    assert len(children['data']) == 20
+    assert children['meta'] == {'count': 20}
+    assert len(document['included']) == 20
+
+
+def test_include_page_size(client, login, notes):
+    document = get_parents(client, login(),
+                           'include=children&page[include.children][size]=3')
+
+    children = document['data'][0]['relationships']['children']
+    assert len(children['data']) == 3
+    assert children['meta'] == {'count': 20}
+    assert {item['id'] for item in document['included']} == \
+        {item['id'] for item in children['data']}
+
+
+def test_nested_include_and_fieldset(client, login, notes, users):
+    document = get_parents(
+        client, login(),
+        'include=children.user&page[include.children][size]=2'
+        '&fields[note]=title,user,children&fields[user]=email'
+    )
+
+    included = {(item['type'], item['id']): item
+                for item in document['included']}
+    assert included[('user', users['user'])]['attributes'] == \
+        {'email': 'user@example.com'}
+
+    children = [item for item in document['included']
+                if item['type'] == 'note']
+    assert len(children) == 2
+    assert all(item['attributes'].keys() == {'title'} for item in children)
@@ -0,0 +1,72 @@
+import enum
+import json
+import sys
+from datetime import date, datetime
+from uuid import UUID
+
+import pytest
+
+from mvapi.web.libs.jsonbackend import get_json_backend, JSONBackend
+
+
+class Color(enum.Enum):
+    RED = 'red'
+
+
+DOCUMENT = {
+    'date': datetime(2021, 5, 4, 3, 2, 1, 123456),
+    'day': date(2021, 5, 4),
+    'id': UUID('12345678-1234-5678-1234-567812345678'),
+    'color': Color.RED,
+    'items': [1, 2.5, None, True, 'a/b'],
+}
+
+EXPECTED = {
+    'date': '2021-05-04T03:02:01.123456+00:00',
+    'day': '2021-05-04',
+    'id': '12345678-1234-5678-1234-567812345678',
+    'color': 'red',
+    'items': [1, 2.5, None, True, 'a/b'],
+}
+
+
+@pytest.mark.parametrize('name', ['json', 'orjson', 'ujson'])
+def test_backends_encode_alike(name):
+    backend = get_json_backend(name)
+
+    encoded = backend.dumps(DOCUMENT)
+
+    assert type(encoded) is bytes
+    assert json.loads(encoded) == EXPECTED
+    assert backend.loads(encoded) == EXPECTED
+
+
+def test_missing_backend_falls_back_to_json(monkeypatch):
+    get_json_backend.cache_clear()
+    monkeypatch.setitem(sys.modules, 'ujson', None)
+
+    try:
+        assert type(get_json_backend('ujson')) is JSONBackend
+    finally:
+        get_json_backend.cache_clear()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_json_backend('yaml')
+
+
+@pytest.mark.parametrize('name', ['json', 'orjson'])
+def test_requests_and_responses_use_the_backend(client, login,
+                                                override_settings, name):
+    override_settings(JSON_BACKEND=name)
+    headers = login()
+
+    response = client.post('/api/notes', headers=headers, json={'data': {
+        'attributes': {'title': 'encoded'}
+    }})
+    assert response.status_code == 201
+
+    response = client.post('/api/notes', headers=headers, data='{"data":',
+                           content_type='application/json')
+    assert response.status_code == 400
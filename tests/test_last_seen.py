@@ -0,0 +1,55 @@
+from mvapi.libs.database import db
+from mvapi.web.libs.lastseen import last_seen_buffer
+from mvapi.web.models.session import Session
+from mvapi.web.models.user import User
+
+
+def get_sessions(client, headers):
+    response = client.get('/api/sessions', headers=headers)
+    assert response.status_code == 200
+
+    # The next request gets a new database session
+    db.session.remove()
+    return response
+
+
+def test_last_seen_is_rendered_after_a_flush(client, login,
+                                             override_settings):
+    override_settings(RENDER_CACHE_SIZE=100,
+                      SESSIONS_LAST_SEEN_INTERVAL=3600)
+    headers = login()
+
+    response = get_sessions(client, headers)
+    assert response.json['data'][0]['attributes']['last_seen'] is None
+    etag = response.headers['ETag']
+
+    assert last_seen_buffer.flush() == 1
+
+    response = get_sessions(client, {**headers, 'If-None-Match': etag})
+    assert response.json['data'][0]['attributes']['last_seen'] is not None
+    assert response.headers['ETag'] != etag
+
+
+def test_touches_are_coalesced_and_bounded(users, override_settings):
+    override_settings(SESSIONS_LAST_SEEN_INTERVAL=3600,
+                      SESSIONS_LAST_SEEN_BUFFER=2)
+    user = User.query.get(users['user'])
+    sessions = [Session.create(user=user) for _ in range(3)]
+    db.session.commit()
+    modified_dates = [session.modified_date for session in sessions]
+
+    last_seen_buffer.flush()
+    stats = last_seen_buffer.stats()
+    for session in sessions + sessions[:1]:
+        last_seen_buffer.touch(session.id_)
+
+    assert last_seen_buffer.coalesced == stats['coalesced'] + 1
+    assert last_seen_buffer.dropped == stats['dropped'] + 1
+    assert last_seen_buffer.flush() == 2
+
+    db.session.remove()
+    sessions = [Session.query.get(session.id_) for session in sessions]
+    assert [session.last_seen is not None for session in sessions] == \
+        [True, True, False]
+    assert [session.modified_date for session in sessions] == \
+        modified_dates
@@ -0,0 +1,86 @@
+import logging
+import queue
+import threading
+
+import pytest
+
+from mvapi.libs import logger as logger_module
+from mvapi.libs.logger import DrainingQueueListener, DroppingQueueHandler, \
+    init_logger, logger, stop_logger
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super(ListHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def queue_logger():
+    test_logger = logging.getLogger('mvapi-tests.queue')
+    test_logger.propagate = False
+    yield test_logger
+    test_logger.handlers = []
+
+
+def test_full_queue_drops_and_counts_records(queue_logger):
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    queue_logger.handlers = [queue_handler]
+    handler = ListHandler()
+
+    for idx in range(3):
+        queue_logger.warning(f'record {idx}')
+
+    listener = DrainingQueueListener(queue_handler, handler)
+    listener.start()
+    listener.stop()
+
+    assert [record.getMessage() for record in handler.records] == [
+        'record 0',
+        'record 1',
+        '1 log records were dropped, the logging queue was full',
+    ]
+
+
+def test_records_are_handled_by_the_listener_thread(queue_logger):
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=10))
+    queue_logger.handlers = [queue_handler]
+
+    threads = []
+
+    class ThreadHandler(ListHandler):
+        def emit(self, record):
+            threads.append(threading.current_thread())
+            super(ThreadHandler, self).emit(record)
+
+    handler = ThreadHandler()
+    listener = DrainingQueueListener(queue_handler, handler)
+    listener.start()
+
+    queue_logger.warning('queued')
+    listener.stop()
+
+    assert [record.getMessage() for record in handler.records] == ['queued']
+    assert threads[0] is not threading.current_thread()
+
+
+def test_init_logger_enqueues_records(override_settings):
+    override_settings(LOGGING_QUEUE=True, LOGGING_QUEUE_SIZE=5)
+
+    try:
+        init_logger()
+
+        assert len(logger.handlers) == 1
+        assert isinstance(logger.handlers[0], DroppingQueueHandler)
+        assert logger_module._listener is not None
+    finally:
+        stop_logger()
+        assert logger_module._listener is None
+
+        override_settings(LOGGING_QUEUE=False)
+        init_logger()
+
+    assert not isinstance(logger.handlers[0], DroppingQueueHandler)
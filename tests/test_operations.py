@@ -0,0 +1,63 @@
+from sampleapp.models.note import Note
+
+
+def post_operations(client, headers, operations):
+    return client.post('/api/operations', headers=headers,
+                       json={'atomic:operations': operations})
+
+
+def test_operations_reference_local_ids(client, login):
+    response = post_operations(client, login(), [
+        {'op': 'add', 'data': {'type': 'note', 'lid': 'parent',
+                               'attributes': {'title': 'parent'}}},
+        {'op': 'add', 'data': {
+            'type': 'note',
+            'attributes': {'title': 'child'},
+            'relationships': {
+                'parent': {'data': {'type': 'note', 'lid': 'parent'}}
+            }
+        }},
+        {'op': 'update', 'data': {'type': 'note', 'lid': 'parent',
+                                  'attributes': {'body': 'updated'}}},
+    ])
+
+    assert response.status_code == 200
+    assert 'ext="https://jsonapi.org/ext/atomic"' in \
+        response.headers['Content-Type']
+
+    results = response.json['atomic:results']
+    parent_id = results[0]['data']['id']
+    assert results[1]['data']['relationships']['parent']['data'] == \
+        {'type': 'note', 'id': parent_id}
+    assert results[2]['data']['id'] == parent_id
+
+    assert Note.query.get(parent_id).body == 'updated'
+    assert Note.query.filter(Note.parent_id == parent_id).count() == 1
+
+
+def test_failed_operation_rolls_back_the_others(client, login):
+    response = post_operations(client, login(), [
+        {'op': 'add', 'data': {'type': 'note',
+                               'attributes': {'title': 'added'}}},
+        {'op': 'update', 'data': {'type': 'note', 'lid': 'missing',
+                                  'attributes': {'title': 'updated'}}},
+    ])
+
+    assert response.status_code == 400
+    assert response.json['errors'] == ['Local id missing is not defined']
+    assert response.json['source'] == {'pointer': '/atomic:operations/1'}
+    assert Note.query.count() == 0
+
+
+def test_operations_are_required(client, login):
+    response = post_operations(client, login(), [])
+
+    assert response.status_code == 400
+    assert response.json['errors'] == ['Atomic operations are required']
+
+
+def test_unsupported_operation(client, login):
+    response = post_operations(client, login(), [{'op': 'replace'}])
+
+    assert response.status_code == 400
+    assert response.json['source'] == {'pointer': '/atomic:operations/0'}
@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import Boolean, Column, create_engine, String
+from sqlalchemy.orm import declarative_base, Session
+
+from mvapi.libs.pagination import KeysetPagination
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = 'item'
+
+    id_ = Column('id', String, primary_key=True)
+    email = Column(String, nullable=False)
+    is_admin = Column(Boolean, nullable=False)
+    flag = Column(Boolean)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        for idx in range(12):
+            session.add(Item(
+                id_=f'{idx:02}',
+                email=f'user{idx % 5}@example.com',
+                is_admin=idx % 3 == 0,
+                flag=None if idx % 4 == 0 else idx % 2 == 0
+            ))
+        session.commit()
+        yield session
+
+
+def paginate(session, sort, limit=5):
+    pagination = KeysetPagination(Item, sort=sort)
+    query = session.query(Item).order_by(*pagination.order_by)
+
+    ids, cursor = [], None
+    while True:
+        page_query = query
+        if cursor:
+            page_query = page_query.filter(pagination.get_filter(cursor))
+
+        items = page_query.limit(limit).all()
+        ids += [item.id_ for item in items]
+
+        if len(items) < limit:
+            return ids
+
+        cursor = pagination.encode(items[-1])
+
+
+@pytest.mark.parametrize('sort', [
+    [Item.is_admin.asc()],
+    [Item.is_admin.desc()],
+    [Item.is_admin.asc(), Item.email.desc()],
+    [Item.is_admin.desc(), Item.email.asc()],
+    [Item.email.desc(), Item.is_admin.asc()],
+    [Item.flag.asc(), Item.email.asc()],
+    [Item.flag.desc().nullsfirst(), Item.is_admin.asc()],
+])
+def test_boolean_and_mixed_direction_keys(session, sort):
+    pagination = KeysetPagination(Item, sort=sort)
+    expected = [item.id_ for item in
+                session.query(Item).order_by(*pagination.order_by)]
+
+    assert paginate(session, sort) == expected
+    assert len(expected) == 12
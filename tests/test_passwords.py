@@ -0,0 +1,77 @@
+import threading
+
+import bcrypt
+import pytest
+
+from mvapi.libs.database import db
+from mvapi.web.libs.exceptions import ServiceUnavailableError
+from mvapi.web.libs.passwords import FAST_ROUNDS, PasswordHasher
+from mvapi.web.models.user import User
+
+
+def get_rounds(hashed):
+    return int(hashed.split('$')[2])
+
+
+def test_fast_mode_uses_the_least_cost():
+    hasher = PasswordHasher()
+    hashed = hasher.hash('secret')
+
+    assert get_rounds(hashed) == FAST_ROUNDS
+    assert hasher.verify('secret', hashed)
+    assert not hasher.verify('wrong', hashed)
+    assert not hasher.verify('secret', None)
+
+
+def test_pool_uses_the_configured_cost(override_settings):
+    override_settings(PASSWORD_HASH_FAST=False, PASSWORD_HASH_ROUNDS=5)
+    hasher = PasswordHasher()
+    hashed = hasher.hash('secret')
+
+    assert get_rounds(hashed) == 5
+    assert hasher.verify('secret', hashed)
+    assert not hasher.needs_rehash(hashed)
+    assert hasher.needs_rehash(
+        bcrypt.hashpw(b'secret', bcrypt.gensalt(rounds=4)).decode()
+    )
+
+
+def test_saturated_pool_is_unavailable(override_settings, monkeypatch):
+    override_settings(PASSWORD_HASH_FAST=False, PASSWORD_HASH_WORKERS=1,
+                      PASSWORD_HASH_QUEUE=0)
+    hasher = PasswordHasher()
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hashpw(password, salt):
+        started.set()
+        release.wait()
+        return b'hashed'
+
+    monkeypatch.setattr(bcrypt, 'hashpw', slow_hashpw)
+
+    thread = threading.Thread(target=hasher.hash, args=('secret',))
+    thread.start()
+    started.wait()
+
+    try:
+        with pytest.raises(ServiceUnavailableError):
+            hasher.hash('secret')
+    finally:
+        release.set()
+        thread.join()
+
+    assert hasher.stats()['rejected'] == 1
+    assert hasher.hash('secret') == 'hashed'
+
+
+def test_password_is_rehashed_on_login(client, users, override_settings):
+    override_settings(PASSWORD_HASH_FAST=False, PASSWORD_HASH_ROUNDS=5)
+
+    response = client.post('/api/sessions', json={'data': {
+        'attributes': {'email': 'user@example.com', 'password': 'secret'}
+    }})
+    assert response.status_code == 201
+
+    db.session.remove()
+    assert get_rounds(User.query.get(users['user']).password) == 5
@@ -0,0 +1,36 @@
+import logging
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from mvapi.libs.database import pool_checkout, watch_pool_checkouts
+
+
+def test_checkouts_report_the_pool_usage(caplog):
+    engine = create_engine('sqlite://', poolclass=QueuePool, pool_size=1,
+                           max_overflow=1, pool_timeout=5)
+    watch_pool_checkouts(engine.pool, capacity=2)
+
+    received = []
+
+    def receiver(sender, **kwargs):
+        received.append(kwargs)
+
+    pool_checkout.connect(receiver)
+    try:
+        with caplog.at_level(logging.WARNING):
+            first = engine.connect()
+            assert not caplog.records
+
+            second = engine.connect()
+    finally:
+        pool_checkout.disconnect(receiver)
+
+    assert received == [{'checked_out': 1, 'capacity': 2},
+                        {'checked_out': 2, 'capacity': 2}]
+    assert 'All 2 database connections are checked out' in caplog.text
+    assert 'wait up to 5s' in caplog.text
+
+    first.close()
+    second.close()
+    engine.dispose()
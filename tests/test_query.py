@@ -0,0 +1,102 @@
+import pytest
+
+from mvapi.libs.database import db
+from mvapi.libs.exceptions import NotFoundError
+from mvapi.web.models.user import User
+from mvapi.web.views import RESOURCE_VIEWS
+from sampleapp.models.note import Note
+from sampleapp.views.notes import NotesView
+
+
+class LinkingNotesView(NotesView):
+    select_relationships = True
+
+    def post_children_relationship(self):
+        return self.request_relationships['children']
+
+
+@pytest.fixture
+def notes(users):
+    user = User.query.get(users['user'])
+    notes = [Note.create(title=f'note {idx}', user=user) for idx in range(3)]
+    db.session.commit()
+    return [note.id_ for note in notes]
+
+
+def test_get_takes_loaded_items_from_the_identity_map(notes, statements):
+    note = Note.query.get(notes[0])
+    statements.clear()
+
+    assert Note.query.get(notes[0]) is note
+    assert statements == []
+
+
+def test_get_raises_not_found(notes):
+    with pytest.raises(NotFoundError):
+        Note.query.get('missing')
+
+
+def test_get_with_criteria_queries_the_database(notes, users):
+    admin = User.query.get(users['admin'])
+    Note.query.get(notes[0])
+
+    with pytest.raises(NotFoundError):
+        Note.query.filter(Note.user == admin).get(notes[0])
+
+
+def test_get_many(notes, statements):
+    loaded = Note.query.get(notes[1])
+    db.session.expire(Note.query.get(notes[2]))
+    statements.clear()
+
+    items = Note.query.get_many([notes[2], notes[1], notes[2], notes[0]])
+
+    assert [item.id_ for item in items] == [notes[2], notes[1], notes[0]]
+    assert items[1] is loaded
+    assert len(statements) == 1
+
+    with pytest.raises(NotFoundError):
+        Note.query.get_many([notes[0], 'missing'])
+
+    assert len(Note.query.get_many([notes[0], 'missing'],
+                                   strict=False)) == 1
+
+
+def post_children(client, headers, note_id, child_ids):
+    return client.post(
+        f'/api/notes/{note_id}/relationships/children',
+        json={'data': [{'type': 'note', 'id': id_} for id_ in child_ids]},
+        headers=headers
+    )
+
+
+def test_relationship_items_with_duplicate_ids(client, login, notes,
+                                               monkeypatch):
+    monkeypatch.setitem(RESOURCE_VIEWS, 'notes', LinkingNotesView)
+
+    response = post_children(client, login(), notes[0],
+                             [notes[1], notes[2], notes[1]])
+
+    assert response.status_code == 201
+    assert [item['id'] for item in response.json['data']] == \
+        [notes[1], notes[2]]
+
+
+def test_relationship_items_must_exist(client, login, notes, monkeypatch):
+    monkeypatch.setitem(RESOURCE_VIEWS, 'notes', LinkingNotesView)
+
+    response = post_children(client, login(), notes[0],
+                             [notes[1], 'missing'])
+
+    assert response.status_code == 400
+
+
+def test_relationship_items_lookup_is_opt_in(client, login, notes,
+                                             monkeypatch):
+    monkeypatch.setattr(NotesView, 'post_children_relationship',
+                        LinkingNotesView.post_children_relationship,
+                        raising=False)
+
+    response = post_children(client, login(), notes[0], [notes[1]])
+
+    assert response.status_code == 500
@@ -0,0 +1,30 @@
+from mvapi.libs.database import db
+from mvapi.web.views import RESOURCE_VIEWS
+from sampleapp.models.note import Note
+from sampleapp.views.notes import NotesView
+
+
+class WritingNotesView(NotesView):
+    def get(self):
+        note = Note.create(title='written', user=self.current_user)
+        db.session.flush()
+        return note
+
+
+def test_get_runs_in_a_read_only_session(client, login):
+    response = client.get('/api/notes', headers=login())
+
+    assert response.status_code == 200
+    assert db.read_only
+
+
+def test_writing_get_is_not_allowed(client, login, monkeypatch):
+    monkeypatch.setitem(RESOURCE_VIEWS, 'notes', WritingNotesView)
+
+    response = client.get('/api/notes', headers=login())
+
+    assert response.status_code == 405
+    assert response.json['errors'] == [
+        'Changes can\'t be saved in a read only request'
+    ]
+    assert Note.query.count() == 0
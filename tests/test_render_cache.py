@@ -0,0 +1,87 @@
+import pytest
+
+from mvapi.libs.database import db
+from mvapi.web.libs.rendercache import render_cache
+from mvapi.web.models.user import User
+from mvapi.web.serializers import RESOURCE_SERIALIZERS
+from sampleapp.models.note import Note
+from sampleapp.serializers.note import NoteSerializer
+
+
+class CachedNoteSerializer(NoteSerializer):
+    cache_attributes = True
+
+
+@pytest.fixture
+def note(users, override_settings, monkeypatch):
+    override_settings(RENDER_CACHE_SIZE=100)
+    CachedNoteSerializer.compile(model=Note)
+    monkeypatch.setitem(RESOURCE_SERIALIZERS, 'note', CachedNoteSerializer)
+
+    note = Note.create(title='note', user=User.query.get(users['user']))
+    db.session.commit()
+    return note.id_
+
+
+def get_title(client, headers, url='/api/notes'):
+    db.session.remove()
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response.json['data'][0].get('attributes', {}).get('title')
+
+
+def test_rendered_attributes_are_cached(client, login, note):
+    headers = login()
+
+    assert get_title(client, headers) == 'note'
+    hits = render_cache.hits
+
+    assert get_title(client, headers) == 'note'
+    assert render_cache.hits == hits + 1
+    assert render_cache.stats()['hit_ratio'] > 0
+
+
+def test_changed_resource_is_rendered_again(client, login, note):
+    headers = login()
+    get_title(client, headers)
+
+    db.session.remove()
+    Note.query.get(note).title = 'changed'
+    db.session.commit()
+
+    assert get_title(client, headers) == 'changed'
+
+
+def test_entries_depend_on_the_audience_and_fields(client, login, note):
+    user, admin = login(), login('admin@example.com')
+    get_title(client, user)
+
+    misses = render_cache.misses
+    get_title(client, admin)
+    assert get_title(client, user, '/api/notes?fields[note]=body') is None
+    assert render_cache.misses == misses + 2
+
+    hits = render_cache.hits
+    get_title(client, user)
+    assert render_cache.hits == hits + 1
+
+
+def test_serializers_opt_in(client, login, note, monkeypatch):
+    monkeypatch.setitem(RESOURCE_SERIALIZERS, 'note', NoteSerializer)
+    headers = login()
+    size = render_cache.stats()['size']
+
+    get_title(client, headers)
+    get_title(client, headers)
+    assert render_cache.stats()['size'] == size
+
+
+def test_entries_are_bounded(override_settings):
+    override_settings(RENDER_CACHE_SIZE=2)
+
+    for key in ('a', 'b', 'c'):
+        render_cache.set(key, {'key': key})
+
+    assert render_cache.get('a') is None
+    assert render_cache.get('c') == {'key': 'c'}
+    assert render_cache.stats()['evictions'] == 1
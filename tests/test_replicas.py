@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import time
+
+import pytest
+
+from mvapi.libs.database import create_db_engine, db, ReplicaBalancer
+from mvapi.web.libs.appfactory import PRIMARY_COOKIE
+
+
+@pytest.fixture
+def replica(login):
+    if db.session.get_bind().dialect.name != 'sqlite':
+        pytest.skip('The replica is a copy of an SQLite database')
+
+    headers = login()
+    db.session.remove()
+
+    # The replica is a copy of the primary database that isn't updated
+    path = os.path.join(tempfile.gettempdir(), 'mvapi-tests-replica.sqlite')
+    shutil.copy(db.session.get_bind().url.database, path)
+    engine = create_db_engine(f'sqlite:///{path}')
+
+    db.session.remove()
+    db.session.configure(balancer=ReplicaBalancer([engine]))
+
+    yield headers
+
+    db.session.remove()
+    db.session.configure(balancer=None)
+    engine.dispose()
+    os.remove(path)
+
+
+def create_note(client, headers):
+    response = client.post('/api/notes', headers=headers, json={'data': {
+        'attributes': {'title': 'written'}
+    }})
+    assert response.status_code == 201
+
+    # The next request is served by another process, which doesn't know the
+    # user has written
+    db.session.remove()
+    db._DB__sticky_users.clear()
+
+    return response
+
+
+def get_titles(client, headers):
+    response = client.get('/api/notes', headers=headers)
+    assert response.status_code == 200
+    return [item['attributes']['title'] for item in response.json['data']]
+
+
+def test_client_reads_its_writes_from_the_primary(client, replica):
+    response = create_note(client, replica)
+
+    cookie = response.headers['Set-Cookie']
+    assert cookie.startswith(f'{PRIMARY_COOKIE}=')
+    assert 'HttpOnly' in cookie
+
+    assert get_titles(client, replica) == ['written']
+
+
+def test_client_without_the_cookie_reads_from_the_replica(client, replica):
+    create_note(client, replica)
+    client.cookie_jar.clear()
+
+    assert get_titles(client, replica) == []
+
+
+def test_expired_cookie_reads_from_the_replica(client, replica):
+    create_note(client, replica)
+    client.set_cookie('localhost', PRIMARY_COOKIE, str(time.time() - 1))
+
+    assert get_titles(client, replica) == []
+
+
+def test_malformed_cookie_reads_from_the_replica(client, replica):
+    create_note(client, replica)
+    client.set_cookie('localhost', PRIMARY_COOKIE, 'soon')
+
+    assert get_titles(client, replica) == []
+
+
+def test_no_cookie_without_replicas(client, login):
+    response = create_note(client, login())
+    assert 'Set-Cookie' not in response.headers
+
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from sqlalchemy import update
+
+from mvapi.libs.database import db
+from mvapi.web.libs.revocation import revocation_list
+from mvapi.web.models.session import Session
+from mvapi.web.models.user import User
+
+
+def create_session(users):
+    session = Session.create(user=User.query.get(users['user']))
+    db.session.commit()
+    return session.id_
+
+
+def revoke_elsewhere(session_id):
+    # Another process revokes the session, no event reaches this one
+    table = Session.__table__
+    with db.session.get_bind().begin() as connection:
+        connection.execute(
+            update(table)
+            .where(table.c.id == session_id)
+            .values(revoked_date=datetime.utcnow(),
+                    modified_date=datetime.utcnow())
+        )
+
+
+def wait_for_refresh():
+    thread = revocation_list._RevocationList__thread
+    if thread:
+        thread.join()
+
+
+def test_first_check_loads_the_list(users):
+    session_id = create_session(users)
+    revoke_elsewhere(session_id)
+
+    assert revocation_list.is_revoked(session_id, 1)
+
+
+def test_stale_list_is_refreshed_in_the_background(users, override_settings):
+    session_id = create_session(users)
+    assert not revocation_list.is_revoked(session_id, 1)
+
+    override_settings(JWTAUTH_SETTINGS='{"REVOCATION_REFRESH": 0}')
+    revoke_elsewhere(session_id)
+
+    # The check doesn't wait for the database
+    assert not revocation_list.is_revoked(session_id, 1)
+    wait_for_refresh()
+
+    assert revocation_list.is_revoked(session_id, 1)
+
+
+def test_fresh_list_is_not_refreshed(users):
+    session_id = create_session(users)
+    assert not revocation_list.is_revoked(session_id, 1)
+
+    revoke_elsewhere(session_id)
+
+    assert not revocation_list.is_revoked(session_id, 1)
+    wait_for_refresh()
+    assert not revocation_list.is_revoked(session_id, 1)
+
+
+def test_local_revocations_apply_at_once(users):
+    session_id = create_session(users)
+    assert not revocation_list.is_revoked(session_id, 1)
+
+    Session.query.get(session_id).revoke()
+    db.session.commit()
+
+    assert revocation_list.is_revoked(session_id, 1)
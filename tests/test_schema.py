@@ -0,0 +1,41 @@
+import pytest
+
+from mvapi.libs.exceptions import ModelKeyError
+from mvapi.web.models.user import User
+from sampleapp.models.note import Note
+
+
+def test_schema_is_built_once(app):
+    assert Note.schema is Note.schema
+    assert Note.schema is not User.schema
+
+
+def test_schema_describes_the_model(app):
+    schema = Note.schema
+
+    assert {'id_', 'title', 'body', 'user_id', 'parent_id'} <= schema.columns
+    assert {'user', 'parent', 'children'} <= schema.relationships.keys()
+    assert schema.foreign_keys['user_id'] == 'user'
+    assert schema.foreign_keys['parent_id'] == 'parent'
+    assert {'title', 'user'} <= schema.required_keys
+    assert 'user_id' not in schema.required_keys
+    assert schema.linkage == {'user': ('user_id', 'user'),
+                              'parent': ('parent_id', 'note')}
+    assert schema.dynamic_relationships == {'children'}
+
+
+def test_schema_is_frozen(app):
+    with pytest.raises(TypeError):
+        Note.schema.relationships['extra'] = frozenset()
+
+    with pytest.raises(AttributeError):
+        Note.schema.columns.add('extra')
+
+
+def test_required_keys_are_checked(users):
+    with pytest.raises(ModelKeyError):
+        Note(body='no title')
+
+    note = Note(title='title', user=User.query.get(users['user']))
+    with pytest.raises(ModelKeyError):
+        note.title = ''
@@ -0,0 +1,70 @@
+import pytest
+
+from mvapi.libs.database import db
+from mvapi.web.models.user import User
+from mvapi.web.serializers import RESOURCE_SERIALIZERS
+from sampleapp.models.note import Note
+from sampleapp.serializers.note import NoteSerializer
+
+
+class AdminNoteSerializer(NoteSerializer):
+    admin_relationships = {'user'}
+    exclude_relationships = {'children'}
+
+
+class LinkedNoteSerializer(NoteSerializer):
+    def render_links(self):
+        return {'self': f'/notes/{self.item.title}'}
+
+
+@pytest.fixture
+def notes(users):
+    user = User.query.get(users['user'])
+    parent = Note.create(title='parent', body='a long body text', user=user)
+    Note.create(title='child', user=user, parent=parent)
+    db.session.commit()
+
+
+def get_notes(client, headers):
+    response = client.get('/api/notes?sort=title', headers=headers)
+    assert response.status_code == 200
+    return response.json['data']
+
+
+def test_resources_are_rendered(client, login, notes):
+    child, parent = get_notes(client, login())
+
+    assert parent['type'] == 'note'
+    assert parent['attributes']['headline'] == 'PARENT'
+    assert parent['attributes']['summary'] == 'a long bod'
+    assert parent['links'] == {
+        'self': f'http://localhost/api/notes/{parent["id"]}'
+    }
+    assert list(parent['relationships']) == ['children', 'parent', 'user']
+    assert parent['relationships']['children']['links'] == {
+        'self': f'http://localhost/api/notes/{parent["id"]}'
+                f'/relationships/children',
+        'related': f'http://localhost/api/notes/{parent["id"]}/children',
+    }
+    assert 'data' not in parent['relationships']['parent']
+    assert child['relationships']['parent']['data'] == \
+        {'type': 'note', 'id': parent['id']}
+
+
+def test_plans_depend_on_the_audience(client, login, notes, monkeypatch):
+    AdminNoteSerializer.compile(model=Note)
+    monkeypatch.setitem(RESOURCE_SERIALIZERS, 'note', AdminNoteSerializer)
+
+    data = get_notes(client, login())
+    assert list(data[0]['relationships']) == ['parent']
+
+    data = get_notes(client, login('admin@example.com'))
+    assert list(data[0]['relationships']) == ['parent', 'user']
+
+
+def test_custom_links_are_rendered(client, login, notes, monkeypatch):
+    LinkedNoteSerializer.compile(model=Note)
+    monkeypatch.setitem(RESOURCE_SERIALIZERS, 'note', LinkedNoteSerializer)
+
+    data = get_notes(client, login())
+    assert data[0]['links'] == {'self': '/notes/child'}
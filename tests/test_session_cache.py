@@ -0,0 +1,65 @@
+from mvapi.libs.database import db
+from mvapi.web.libs.sessioncache import session_cache
+from mvapi.web.models.session import Session
+from mvapi.web.models.user import User
+
+
+def get_notes(client, headers):
+    db.session.remove()
+    return client.get('/api/notes', headers=headers)
+
+
+def test_authenticated_requests_hit_the_cache(client, login, statements):
+    headers = login()
+
+    assert get_notes(client, headers).status_code == 200
+    misses = session_cache.misses
+
+    statements.clear()
+    assert get_notes(client, headers).status_code == 200
+
+    assert session_cache.misses == misses
+    assert session_cache.hits >= 1
+    assert not any('FROM session' in statement for statement in statements)
+
+
+def test_revoked_session_is_invalidated(client, login):
+    headers = login()
+    assert get_notes(client, headers).status_code == 200
+
+    db.session.remove()
+    Session.query.one().revoke()
+    db.session.commit()
+
+    assert get_notes(client, headers).status_code == 401
+
+
+def test_changed_user_is_invalidated(client, login, users):
+    headers = login()
+    assert get_notes(client, headers).status_code == 200
+    assert session_cache.stats()['size'] == 1
+
+    db.session.remove()
+    User.query.get(users['user']).email = 'changed@example.com'
+    db.session.commit()
+
+    assert session_cache.stats()['size'] == 0
+
+
+def test_entries_are_bounded(users, override_settings):
+    override_settings(JWTAUTH_SETTINGS='{"SESSION_CACHE_SIZE": 2}')
+    user = User.query.get(users['user'])
+
+    for session_id in ('a', 'b', 'c'):
+        session_cache.set_user(session_id, user)
+
+    assert session_cache.get_user('a') is None
+    assert session_cache.get_user('c').id_ == user.id_
+    assert session_cache.stats()['size'] == 2
+
+
+def test_entries_expire(users, override_settings):
+    override_settings(JWTAUTH_SETTINGS='{"SESSION_CACHE_TTL": -1}')
+    session_cache.set_user('a', User.query.get(users['user']))
+
+    assert session_cache.get_user('a') is None
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from mvapi.libs.database import db
+from mvapi.web.libs.sessionpruner import PRUNE_LOCK_KEY, SessionPruner
+from mvapi.web.models.session import Session
+from mvapi.web.models.user import User
+
+
+@pytest.fixture
+def sessions(users):
+    user = User.query.get(users['user'])
+    now = datetime.utcnow()
+
+    expired = [Session.create(user=user,
+                              created_date=now - timedelta(days=400))
+               for _ in range(5)]
+    revoked = Session.create(user=user, revoked_date=now - timedelta(days=1))
+    active = Session.create(user=user)
+    db.session.commit()
+
+    return {'expired': [session.id_ for session in expired + [revoked]],
+            'active': active.id_}
+
+
+def test_prune_deletes_expired_and_revoked_sessions(sessions):
+    pruner = SessionPruner(batch_size=2, sleep=0)
+    assert pruner.count() == 6
+
+    removed, _ = pruner.prune()
+
+    assert removed == 6
+    assert [session.id_ for session in Session.query] == [sessions['active']]
+
+
+def test_another_process_prunes_on_postgresql(sessions):
+    engine = db.session.get_bind()
+    if engine.dialect.name != 'postgresql':
+        pytest.skip('Advisory locks are only taken on PostgreSQL')
+
+    with engine.connect() as connection:
+        connection.execute(select(func.pg_advisory_lock(PRUNE_LOCK_KEY)))
+
+        assert SessionPruner(sleep=0).prune() == (0, 0.0)
+        assert Session.query.count() == 7
+
+        connection.execute(select(func.pg_advisory_unlock(PRUNE_LOCK_KEY)))
+
+    removed, _ = SessionPruner(sleep=0).prune()
+    assert removed == 6
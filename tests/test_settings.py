@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from flask import Config
+
+from mvapi.libs.exceptions import InvalidSettingError
+from mvapi.settings.default_settings import DefaultSettings
+from mvapi.settings.loader import Settings, settings_reloaded
+
+
+class ProjectSettings(DefaultSettings):
+    APP_NAME = 'project'
+    DB_URI = 'sqlite://'
+    EXTRA = {'key': 'value'}
+
+    def get_db_name(self):
+        return self.DB_URI.rpartition('/')[2]
+
+
+def test_environment_overrides_are_coerced(monkeypatch):
+    monkeypatch.setenv('DEBUG', 'yes')
+    monkeypatch.setenv('LIMIT', '50')
+    monkeypatch.setenv('SESSIONS_PRUNE_SLEEP', '0.5')
+    monkeypatch.setenv('BLUEPRINTS', 'a.bp, b.bp')
+    monkeypatch.setenv('JWTAUTH_SETTINGS', '{"ACCESS_EXPIRES": 60}')
+
+    settings = Settings(ProjectSettings)
+
+    assert settings.DEBUG is True
+    assert settings.LIMIT == 50
+    assert settings.SESSIONS_PRUNE_SLEEP == 0.5
+    assert settings.BLUEPRINTS == ['a.bp', 'b.bp']
+    assert settings.JWTAUTH_SETTINGS == {'ACCESS_EXPIRES': 60}
+    assert settings.LOGGING['loggers']['project']['level'] == 'DEBUG'
+
+
+@pytest.mark.parametrize('name, value', [
+    ('DEBUG', 'maybe'),
+    ('LIMIT', 'ten'),
+    ('JWTAUTH_SETTINGS', '[1, 2]'),
+])
+def test_malformed_override_raises(monkeypatch, name, value):
+    monkeypatch.setenv(name, value)
+
+    with pytest.raises(InvalidSettingError):
+        Settings(ProjectSettings)
+
+
+def test_syslog_takes_an_address(monkeypatch):
+    monkeypatch.setenv('SYSLOG', '/dev/log')
+
+    settings = Settings(ProjectSettings)
+
+    assert settings.SYSLOG == '/dev/log'
+    assert settings.LOGGING['handlers']['syslog']['address'] == '/dev/log'
+
+
+def test_undeclared_environment_variables(monkeypatch):
+    monkeypatch.setenv('DB_URI', 'postgresql://localhost/project')
+    monkeypatch.setenv('MAILER_API_KEY', 'key')
+
+    settings = Settings(ProjectSettings)
+    config = Config('.')
+    config.from_object(settings)
+
+    assert settings.MAILER_API_KEY == 'key'
+    assert settings.SQLALCHEMY_DATABASE_URI == \
+        'postgresql://localhost/project'
+    assert 'MAILER_API_KEY' not in config
+    assert 'PATH' not in config
+    assert config['DB_URI'] == 'postgresql://localhost/project'
+
+    with pytest.raises(AttributeError):
+        getattr(settings, 'NOT_A_SETTING')
+
+
+def test_helpers_of_the_settings_class(monkeypatch):
+    monkeypatch.delenv('DB_URI', raising=False)
+    settings = Settings(ProjectSettings)
+
+    assert settings.get_db_name() == ''
+    assert settings.types['SYSLOG'] == (bool, str)
+
+
+def test_values_are_plain_and_read_only():
+    settings = Settings(ProjectSettings)
+
+    assert json.dumps(settings.EXTRA) == '{"key": "value"}'
+    assert settings.EXTRA is not ProjectSettings.EXTRA
+
+    with pytest.raises(AttributeError):
+        settings.LIMIT = 10
+
+
+def test_reload(monkeypatch):
+    settings = Settings(ProjectSettings)
+    received = []
+
+    def receiver(sender):
+        received.append(sender)
+
+    settings_reloaded.connect(receiver)
+    try:
+        monkeypatch.setenv('LIMIT', '30')
+        settings.reload()
+    finally:
+        settings_reloaded.disconnect(receiver)
+
+    assert settings.LIMIT == 30
+    assert received == [settings]
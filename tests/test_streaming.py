@@ -0,0 +1,59 @@
+import pytest
+
+from mvapi.libs.database import db
+from mvapi.web.models.user import User
+from mvapi.web.views import RESOURCE_VIEWS
+from sampleapp.models.note import Note
+from sampleapp.views.notes import NotesView
+
+
+class StreamedNotesView(NotesView):
+    stream_response = True
+
+
+@pytest.fixture
+def notes(users):
+    user = User.query.get(users['user'])
+    parent = Note.create(title='parent', user=user)
+    for idx in range(4):
+        Note.create(title=f'child {idx}', user=user, parent=parent)
+    db.session.commit()
+
+
+def test_collection_is_streamed_in_batches(client, login, notes,
+                                           override_settings):
+    override_settings(STREAM_THRESHOLD=2, STREAM_BATCH_SIZE=2)
+
+    response = client.get('/api/notes?page[size]=3&sort=title',
+                          headers=login())
+
+    assert response.status_code == 200
+    assert 'Content-Length' not in response.headers
+    assert [item['attributes']['title'] for item in response.json['data']] \
+        == ['child 0', 'child 1', 'child 2']
+    assert 'next' in response.json['links']
+    assert 'included' not in response.json
+
+
+def test_include_is_not_streamed(client, login, notes, override_settings):
+    override_settings(STREAM_THRESHOLD=2, STREAM_BATCH_SIZE=2)
+
+    response = client.get('/api/notes?page[size]=3&include=children'
+                          '&filter[title]=parent', headers=login())
+
+    assert response.status_code == 200
+    assert 'Content-Length' in response.headers
+    assert len(response.json['included']) == 4
+
+
+def test_streamed_view_rejects_include(client, login, notes, monkeypatch):
+    monkeypatch.setitem(RESOURCE_VIEWS, 'notes', StreamedNotesView)
+    headers = login()
+
+    response = client.get('/api/notes', headers=headers)
+    assert response.status_code == 200
+    assert 'Content-Length' not in response.headers
+    assert len(response.json['data']) == 5
+
+    response = client.get('/api/notes?include=children', headers=headers)
+    assert response.status_code == 400